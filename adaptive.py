@@ -0,0 +1,106 @@
+"""
+自适应读取间隔 - 自动探测硬盘的休眠超时
+
+固定间隔只能靠猜：太短浪费 I/O，太长硬盘会在两次读取之间休眠。
+自适应模式依据每次读取的延迟判断硬盘是否被唤醒（见 latency.py）：
+
+1. 探测：没有唤醒时按倍数逐步拉长间隔，记录最长的"安全"间隔；
+2. 二分：一旦出现唤醒，说明该间隔已超过休眠超时，在安全与不安全间隔之间二分；
+3. 收敛：区间足够小后，取安全间隔再留出余量作为最终间隔；
+4. 回退：收敛后若再次出现唤醒（超时被改短、固件策略变化），缩短间隔重新探测。
+
+本模块不依赖 PyQt5，也不关心时间来源，只处理"上一次间隔 + 是否唤醒"。
+"""
+
+
+class AdaptiveInterval:
+    """根据唤醒事件调整读取间隔（单位：秒）"""
+
+    def __init__(self, initial=60, minimum=5, maximum=3600,
+                 growth=1.5, margin=0.2, resolution=0.1):
+        if not 0 < minimum <= initial <= maximum:
+            raise ValueError("需要满足 0 < 最小间隔 <= 初始间隔 <= 最大间隔")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.growth = growth
+        self.margin = margin
+        self.resolution = resolution
+
+        self.interval = initial
+        self.state = "probing"
+        self.safe = None        # 已验证不会休眠的最长间隔
+        self.unsafe = None      # 已观察到休眠的最短间隔
+        self.backoffs = 0
+
+    @property
+    def settled(self):
+        return self.state == "settled"
+
+    @property
+    def standby_timeout(self):
+        """推断的休眠超时区间 (下界, 上界)，未知的一端为 None"""
+        return self.safe, self.unsafe
+
+    def observe(self, gap, spinup):
+        """
+        记录一次读取的结果并返回新的间隔
+
+        gap 为距上一次读取的实际秒数，spinup 为本次读取是否唤醒了硬盘。
+        """
+        if spinup:
+            self._on_spinup(gap)
+        else:
+            self._on_awake(gap)
+        return self.interval
+
+    def _on_awake(self, gap):
+        if self.safe is None or gap > self.safe:
+            self.safe = gap
+        if self.unsafe is not None and self.safe >= self.unsafe:
+            # 超时比之前观察到的更长，丢弃旧的上界重新探测
+            self.unsafe = None
+        if self.settled:
+            return
+        if self.unsafe is None:
+            if self.safe >= self.maximum:
+                self._settle(self.maximum)
+            else:
+                self.interval = self._clamp(max(self.interval, self.safe) * self.growth)
+            return
+        self._bisect()
+
+    def _on_spinup(self, gap):
+        if self.unsafe is None or gap < self.unsafe:
+            self.unsafe = gap
+        if self.safe is not None and self.safe >= self.unsafe:
+            self.safe = None
+        if self.settled:
+            if self.interval <= self.minimum:
+                return
+            # 收敛后再次休眠：超时变短了，缩短间隔后重新探测
+            self.state = "probing"
+            self.backoffs += 1
+            self.safe = None
+            self.interval = self._clamp(gap / (self.growth * self.growth))
+            return
+        if self.safe is None:
+            if gap <= self.minimum:
+                # 最短间隔下仍会休眠，无法做得更好
+                self._settle(self.minimum)
+            else:
+                self.interval = self._clamp(gap / self.growth)
+            return
+        self._bisect()
+
+    def _bisect(self):
+        if self.unsafe - self.safe <= self.unsafe * self.resolution:
+            self._settle(self.safe * (1 - self.margin))
+        else:
+            self.interval = self._clamp((self.safe + self.unsafe) / 2)
+
+    def _settle(self, interval):
+        self.state = "settled"
+        self.interval = self._clamp(interval)
+
+    def _clamp(self, interval):
+        return max(self.minimum, min(self.maximum, interval))
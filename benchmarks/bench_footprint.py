@@ -0,0 +1,199 @@
+"""
+驻留开销基准测试 - 窗口可见与只剩托盘两种状态下的内存和句柄占用
+
+在子进程中启动图形界面并加入若干保活目标，交替"显示窗口"与"隐藏到托盘"，
+每个状态停留 --dwell 秒后采样：
+
+- rss_kb：常驻内存（Linux 为 /proc/self/status 的 VmRSS，Windows 为工作集）
+- handles：打开的文件描述符数（Linux）或内核句柄数（Windows）
+- gui_objects：GDI + USER 对象数（仅 Windows）
+- widgets：QApplication.allWidgets() 的数量
+
+默认分别以"隐藏时释放窗口"（release）和"隐藏时保留窗口"（keep）各跑一遍，
+比较两种模式下托盘状态的占用，以及多次循环后托盘状态占用的增长（排查泄漏）。
+默认使用 Qt 的 offscreen 平台，不需要显示器；--native 使用系统默认平台。
+
+    python benchmarks/bench_footprint.py --cycles 20 --dwell 30 --output footprint.json
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = ("release", "keep")
+
+
+def process_footprint():
+    """本进程的 (常驻内存 KB, 句柄数, GUI 对象数)，无法获取的项为 None"""
+    if sys.platform.startswith("win"):
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                    "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                    "PagefileUsage", "PeakPagefileUsage")]
+
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb)
+        handles = wintypes.DWORD()
+        ctypes.windll.kernel32.GetProcessHandleCount(process, ctypes.byref(handles))
+        gui = ctypes.windll.user32.GetGuiResources(process, 0) + ctypes.windll.user32.GetGuiResources(process, 1)
+        return counters.WorkingSetSize // 1024, handles.value, gui
+    rss = None
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1])
+                    break
+        handles = len(os.listdir("/proc/self/fd"))
+    except OSError:
+        handles = None
+    return rss, handles, None
+
+
+def run_child(args):
+    """子进程：驱动窗口在两种状态间切换并采样，结果以 JSON 写到标准输出"""
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+
+    import main as gui
+    from scheduler import KeepAliveTarget
+
+    app = QApplication([sys.argv[0]])
+    window = gui.HDDKeepAliveApp()
+    window.release_when_hidden = args.mode == "release"
+    window.show()
+    window.finish_startup()
+    for path in args.paths:
+        window.scheduler.add(KeepAliveTarget(path, args.interval))
+    window.flush_updates()
+
+    samples = []
+    steps = []
+    for cycle in range(args.cycles):
+        steps.append((cycle, "visible", window.show_normal))
+        steps.append((cycle, "tray", window.hide_to_tray))
+
+    def sample(cycle, state):
+        rss, handles, gui_objects = process_footprint()
+        samples.append({"cycle": cycle, "state": state, "rss_kb": rss, "handles": handles,
+                        "gui_objects": gui_objects, "widgets": len(app.allWidgets())})
+
+    def step():
+        if not steps:
+            app.quit()
+            return
+        cycle, state, action = steps.pop(0)
+        action()
+        QTimer.singleShot(int(args.dwell * 1000), lambda: (sample(cycle, state), step()))
+
+    QTimer.singleShot(0, step)
+    app.exec_()
+    window.scheduler.shutdown()
+    json.dump(samples, sys.stdout)
+    return 0
+
+
+def median(values):
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def summarize(samples):
+    summary = {}
+    for state in ("visible", "tray"):
+        rows = [s for s in samples if s["state"] == state]
+        entry = {key: median(s[key] for s in rows)
+                 for key in ("rss_kb", "handles", "gui_objects", "widgets")}
+        if len(rows) > 1 and rows[0]["rss_kb"] is not None:
+            # 第一次循环之后的增长，持续增长说明有泄漏
+            entry["rss_growth_kb"] = rows[-1]["rss_kb"] - rows[1 if len(rows) > 2 else 0]["rss_kb"]
+        summary[state] = entry
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="驻留开销基准测试")
+    parser.add_argument("--cycles", type=int, default=5, help="显示/隐藏循环次数，默认 %(default)s")
+    parser.add_argument("--dwell", type=float, default=5.0, help="每个状态停留的秒数，默认 %(default)s")
+    parser.add_argument("--targets", type=int, default=4, help="保活目标数，默认 %(default)s")
+    parser.add_argument("--interval", type=int, default=1, help="读取间隔（秒），默认 %(default)s")
+    parser.add_argument("--mode", choices=MODES, action="append",
+                        help="只测试指定模式，可重复；默认两种都测")
+    parser.add_argument("--native", action="store_true", help="使用系统默认 Qt 平台而非 offscreen")
+    parser.add_argument("--output", help="把 JSON 结果写入文件")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("paths", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        args.mode = args.mode[0]
+        return run_child(args)
+
+    env = dict(os.environ)
+    # 不连接正在运行的实例
+    env["HDD_KEEPALIVE_INSTANCE"] = f"hdd-keepalive-bench-{os.getpid()}"
+    if not args.native:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+
+    results = {
+        "benchmark": "footprint",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "qt_platform": "native" if args.native else "offscreen",
+        "cycles": args.cycles,
+        "dwell": args.dwell,
+        "targets": args.targets,
+        "modes": {},
+    }
+    base_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory(dir=base_dir) as directory:
+        paths = []
+        for i in range(args.targets):
+            path = os.path.join(directory, f"target{i}.bin")
+            with open(path, "wb") as f:
+                f.write(os.urandom(64 * 1024))
+            paths.append(path)
+        for mode in args.mode or MODES:
+            command = [sys.executable, os.path.abspath(__file__), "--child", "--mode", mode,
+                       "--cycles", str(args.cycles), "--dwell", str(args.dwell),
+                       "--interval", str(args.interval)] + paths
+            output = subprocess.run(command, env=env, cwd=ROOT, stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, check=True).stdout
+            samples = json.loads(output)
+            results["modes"][mode] = {"summary": summarize(samples), "samples": samples}
+
+    for mode, data in results["modes"].items():
+        for state, entry in data["summary"].items():
+            print(f"{mode:>7} {state:>7}: rss {entry['rss_kb']} KB, handles {entry['handles']}, "
+                  f"widgets {entry['widgets']}"
+                  + (f", gui objects {entry['gui_objects']}" if entry["gui_objects"] is not None else "")
+                  + (f", growth {entry['rss_growth_kb']} KB" if "rss_growth_kb" in entry else ""),
+                  file=sys.stderr)
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
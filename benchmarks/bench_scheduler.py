@@ -0,0 +1,266 @@
+"""
+调度器基准测试 - 开销、唤醒次数、内存与截止时间精度
+
+用可注入的虚拟时钟驱动 KeepAliveScheduler，对 tmpfs/临时目录中的文件执行真实读取，
+在不真正等待的情况下模拟一小时运行，分别统计 1/10/100/1000 个目标时：
+
+- 每小时 CPU 时间、唤醒次数、读取次数
+- 旧版 run_task 循环（每个目标一个线程、每秒唤醒一次）的对应数值，作为对照
+- 每个目标的内存占用（tracemalloc）
+
+另以真实时钟短时间运行，测量读取实际发生时间相对截止时间的偏差。
+结果以 JSON 输出；指定 --baseline 时与上次结果比较，超出容差则返回 1。
+
+    python benchmarks/bench_scheduler.py --output bench_output.txt
+    python benchmarks/bench_scheduler.py --baseline bench_output.txt
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import KeepAliveScheduler, KeepAliveTarget, SchedulerListener  # noqa: E402
+
+TARGET_COUNTS = (1, 10, 100, 1000)
+INTERVAL = 60
+SIMULATED_SECONDS = 3600
+
+# 与基准比较时参与回归判断的指标（越小越好）
+REGRESSION_KEYS = ("cpu_seconds_per_hour", "wakeups_per_hour", "memory_bytes_per_target")
+
+
+class FakeClock:
+    """可手动推进的单调时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_files(directory, count):
+    """每个目标一个小文件，模拟分布在不同硬盘上的目标"""
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"target_{i}.bin")
+        with open(path, "wb") as f:
+            f.write(os.urandom(4096))
+        paths.append(path)
+    return paths
+
+
+def simulate(paths, engine, seed=0):
+    """用虚拟时钟跑满 SIMULATED_SECONDS，返回统计结果"""
+    rng = random.Random(seed)
+    clock = FakeClock()
+    # 同步读取：run_pending() 返回时本轮读取均已完成
+    scheduler = KeepAliveScheduler(clock=clock, workers=0)
+    for path in paths:
+        # 各目标在第一个周期内随机时刻启动，相位错开
+        clock.now = rng.uniform(0, INTERVAL)
+        scheduler.add(KeepAliveTarget(path, INTERVAL, engine=engine))
+    clock.now = 0.0
+
+    wakeups = 0
+    cpu_start = time.process_time()
+    while True:
+        deadline = scheduler.run_pending()
+        if deadline is None or deadline > SIMULATED_SECONDS:
+            break
+        clock.now = deadline
+        wakeups += 1
+    cpu = time.process_time() - cpu_start
+
+    reads = sum(t.count for t in scheduler.targets())
+    for target in scheduler.targets():
+        target.engine.close()
+    hours = SIMULATED_SECONDS / 3600
+    return {
+        "targets": len(paths),
+        "cpu_seconds_per_hour": cpu / hours,
+        "wakeups_per_hour": wakeups / hours,
+        "reads_per_hour": reads / hours,
+    }
+
+
+def simulate_legacy(paths):
+    """
+    旧版 run_task 循环的开销对照：每个目标每秒唤醒一次并生成两条界面消息
+
+    只执行循环体（时间格式化），不真正 sleep。
+    """
+    cpu_start = time.process_time()
+    messages = 0
+    start_time = 0
+    for now in range(SIMULATED_SECONDS):
+        for _ in paths:
+            elapsed_time = now - start_time
+            hours, minutes, seconds = elapsed_time // 3600, (elapsed_time % 3600) // 60, elapsed_time % 60
+            _ = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+            _ = f"{INTERVAL - now % INTERVAL} 秒"
+            messages += 2
+    cpu = time.process_time() - cpu_start
+    hours = SIMULATED_SECONDS / 3600
+    return {
+        "legacy_cpu_seconds_per_hour": cpu / hours,
+        "legacy_wakeups_per_hour": len(paths) * SIMULATED_SECONDS / hours,
+        "legacy_messages_per_hour": messages / hours,
+    }
+
+
+def memory_per_target(paths, engine):
+    """加入调度器后每个目标平均占用的内存"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    scheduler = KeepAliveScheduler(clock=FakeClock())
+    for path in paths:
+        scheduler.add(KeepAliveTarget(path, INTERVAL, engine=engine))
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    used = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    for target in scheduler.targets():
+        target.engine.close()
+    return used / len(paths)
+
+
+class LatenessRecorder(SchedulerListener):
+    """记录每次读取完成时间相对截止时间的偏差"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.expected = {}
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def on_started(self, target):
+        with self._lock:
+            self.expected[target.id] = target.started_at
+
+    def on_read(self, target):
+        now = self.clock()
+        with self._lock:
+            expected = self.expected.get(target.id)
+            if expected is not None:
+                self.samples.append(now - expected)
+            self.expected[target.id] = target.next_deadline
+
+
+def deadline_accuracy(paths, engine, seconds, interval):
+    """真实时钟下运行 seconds 秒，返回读取偏差统计（毫秒）"""
+    recorder = LatenessRecorder(time.monotonic)
+    scheduler = KeepAliveScheduler(recorder)
+    scheduler.start()
+    rng = random.Random(1)
+    for path in paths:
+        scheduler.add(KeepAliveTarget(path, interval * rng.uniform(0.5, 1.5), engine=engine))
+    time.sleep(seconds)
+    scheduler.stop()
+    scheduler.join(5)
+    for target in scheduler.targets():
+        target.engine.close()
+
+    samples = sorted(s * 1000 for s in recorder.samples)
+    if not samples:
+        return {"targets": len(paths), "samples": 0}
+
+    def pick(q):
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+    return {
+        "targets": len(paths),
+        "samples": len(samples),
+        "mean_ms": sum(samples) / len(samples),
+        "p50_ms": pick(50),
+        "p99_ms": pick(99),
+        "max_ms": samples[-1],
+        "scheduler_wakeups": scheduler.wakeups,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """与基准结果比较，返回回归项列表"""
+    previous = {entry["targets"]: entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in results["results"]:
+        old = previous.get(entry["targets"])
+        if old is None:
+            continue
+        for key in REGRESSION_KEYS:
+            if key in old and old[key] > 0 and entry[key] > old[key] * (1 + tolerance):
+                regressions.append(f"targets={entry['targets']} {key}: "
+                                   f"{old[key]:.6g} -> {entry[key]:.6g}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="调度器基准测试")
+    parser.add_argument("--targets", type=int, nargs="+", default=list(TARGET_COUNTS))
+    parser.add_argument("--engine", default="cached",
+                        help="读取引擎，默认 cached 以排除磁盘本身的影响")
+    parser.add_argument("--dir", help="放置测试文件的目录，默认使用 /dev/shm 或临时目录")
+    parser.add_argument("--accuracy-seconds", type=float, default=3.0,
+                        help="截止时间精度测试的真实运行时长")
+    parser.add_argument("--accuracy-interval", type=float, default=0.2,
+                        help="截止时间精度测试的平均读取间隔（秒）")
+    parser.add_argument("--output", help="把 JSON 结果写入文件")
+    parser.add_argument("--baseline", help="与之前的 JSON 结果比较")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="允许的相对退化，默认 %(default)s")
+    args = parser.parse_args(argv)
+
+    base_dir = args.dir or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
+    results = {
+        "benchmark": "scheduler",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "interval": INTERVAL,
+        "simulated_seconds": SIMULATED_SECONDS,
+        "results": [],
+        "deadline_accuracy": [],
+    }
+    with tempfile.TemporaryDirectory(dir=base_dir) as directory:
+        paths = make_files(directory, max(args.targets))
+        for count in args.targets:
+            entry = simulate(paths[:count], args.engine)
+            entry.update(simulate_legacy(paths[:count]))
+            entry["memory_bytes_per_target"] = memory_per_target(paths[:count], args.engine)
+            results["results"].append(entry)
+            print(f"targets={count}: {entry['cpu_seconds_per_hour']:.4f} CPU-s/h, "
+                  f"{entry['wakeups_per_hour']:.0f} wakeups/h "
+                  f"(legacy {entry['legacy_wakeups_per_hour']:.0f}), "
+                  f"{entry['memory_bytes_per_target']:.0f} B/target", file=sys.stderr)
+        if args.accuracy_seconds > 0:
+            for count in args.targets:
+                if count > 100:
+                    continue
+                accuracy = deadline_accuracy(paths[:count], args.engine,
+                                             args.accuracy_seconds, args.accuracy_interval)
+                results["deadline_accuracy"].append(accuracy)
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"回归: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+启动基准测试 - 冷启动/热启动到首个窗口、到首次保活读取的时间
+
+多次启动图形界面（默认 python main.py，也可用 --command 指定 PyInstaller 打包出的程序），
+命令行传入一个临时文件作为保活目标，通过 HDD_KEEPALIVE_PROFILE_STARTUP 让程序在
+界面就绪且完成首次读取后写出各阶段耗时，随后结束进程。统计：
+
+- first_window_ms：进程创建到窗口第一次绘制
+- first_read_ms：进程创建到第一次保活读取
+- ready_ms：进程创建到样式表、托盘等延后的初始化完成
+- wall_ms：本脚本启动进程到拿到耗时文件的时间（含轮询误差，作为对照）
+
+第一次启动使用全新的字节码缓存目录（PYTHONPYCACHEPREFIX），记为冷启动；
+Linux 上以 root 运行并指定 --drop-caches 时还会先清空页缓存。其余为热启动，取中位数。
+默认使用 Qt 的 offscreen 平台，不需要显示器；--native 使用系统默认平台。
+
+    python benchmarks/bench_startup.py --output startup.json
+    python benchmarks/bench_startup.py --baseline startup.json
+    python benchmarks/bench_startup.py --command dist/硬盘保活工具.exe --native
+"""
+import os
+import sys
+import json
+import time
+import shlex
+import argparse
+import platform
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from startup import ENV_VAR  # noqa: E402
+
+# 结果字段与程序记录的阶段名
+PHASES = {"first_window_ms": "首次绘制", "first_read_ms": "首次读取", "ready_ms": "托盘"}
+
+# 与基准比较时参与回归判断的指标（越小越好）
+REGRESSION_KEYS = ("first_window_ms", "first_read_ms", "ready_ms")
+
+
+def drop_page_cache():
+    """清空 Linux 页缓存，需要 root；返回是否成功"""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except (OSError, AttributeError):
+        return False
+
+
+def launch(command, target, env, timeout):
+    """启动一次程序，等待耗时文件出现后结束进程，返回本次的各项指标"""
+    with tempfile.TemporaryDirectory() as directory:
+        report = os.path.join(directory, "startup.json")
+        env = dict(env, **{ENV_VAR: report})
+        begin = time.perf_counter()
+        process = subprocess.Popen(command + [target], env=env, stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while not os.path.exists(report):
+                if process.poll() is not None:
+                    raise RuntimeError(f"程序提前退出，返回码 {process.returncode}")
+                if time.perf_counter() - begin > timeout:
+                    raise RuntimeError(f"{timeout} 秒内没有完成启动")
+                time.sleep(0.002)
+            wall = time.perf_counter() - begin
+        finally:
+            process.terminate()
+            try:
+                process.wait(5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        with open(report, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+    marks = {phase["phase"]: phase["at_ms"] for phase in data["phases"]}
+    entry = {key: marks.get(name) for key, name in PHASES.items()}
+    entry["wall_ms"] = wall * 1000
+    entry["since_process_start"] = data["since_process_start"]
+    entry["phases"] = data["phases"]
+    return entry
+
+
+def median(values):
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def summarize(runs):
+    """热启动各指标取中位数，阶段明细取最后一次"""
+    summary = {key: median(run[key] for run in runs) for key in list(PHASES) + ["wall_ms"]}
+    summary["runs"] = len(runs)
+    summary["phases"] = runs[-1]["phases"]
+    return summary
+
+
+def compare(results, baseline, tolerance):
+    """与基准结果比较，返回回归项列表"""
+    regressions = []
+    for kind in ("cold", "warm"):
+        old, new = baseline.get(kind) or {}, results.get(kind) or {}
+        for key in REGRESSION_KEYS:
+            if old.get(key) and new.get(key) and new[key] > old[key] * (1 + tolerance):
+                regressions.append(f"{kind} {key}: {old[key]:.1f} -> {new[key]:.1f} ms")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="启动基准测试")
+    parser.add_argument("--command", help="启动命令，默认用当前解释器运行 main.py")
+    parser.add_argument("--runs", type=int, default=5, help="热启动次数，默认 %(default)s")
+    parser.add_argument("--native", action="store_true", help="使用系统默认 Qt 平台而非 offscreen")
+    parser.add_argument("--drop-caches", action="store_true",
+                        help="冷启动前清空页缓存（Linux，需要 root）")
+    parser.add_argument("--timeout", type=float, default=30.0, help="单次启动的超时（秒）")
+    parser.add_argument("--output", help="把 JSON 结果写入文件")
+    parser.add_argument("--baseline", help="与之前的 JSON 结果比较")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="允许的相对退化，默认 %(default)s")
+    args = parser.parse_args(argv)
+
+    if args.command:
+        command = shlex.split(args.command, posix=os.name != "nt")
+    else:
+        command = [sys.executable, os.path.join(ROOT, "main.py")]
+
+    base_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory(dir=base_dir) as directory:
+        target = os.path.join(directory, "target.bin")
+        with open(target, "wb") as f:
+            f.write(os.urandom(4096))
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=os.path.join(directory, "pycache"))
+        # 热启动要用到冷启动写下的字节码缓存
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        # 不连接正在运行的实例，每次启动都是独立的新实例
+        env["HDD_KEEPALIVE_INSTANCE"] = f"hdd-keepalive-bench-{os.getpid()}"
+        if not args.native:
+            env["QT_QPA_PLATFORM"] = "offscreen"
+
+        dropped = drop_page_cache() if args.drop_caches else False
+        cold = launch(command, target, env, args.timeout)
+        cold["page_cache_dropped"] = dropped
+        warm = [launch(command, target, env, args.timeout) for _ in range(args.runs)]
+
+    results = {
+        "benchmark": "startup",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "command": command,
+        "qt_platform": "native" if args.native else "offscreen",
+        "cold": cold,
+        "warm": summarize(warm) if warm else None,
+    }
+    for kind in ("cold", "warm"):
+        entry = results[kind]
+        if entry:
+            print(f"{kind}: window {entry['first_window_ms']:.1f} ms, "
+                  f"first read {entry['first_read_ms']:.1f} ms, "
+                  f"ready {entry['ready_ms']:.1f} ms, wall {entry['wall_ms']:.1f} ms", file=sys.stderr)
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"回归: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,490 @@
+"""
+硬盘保活工具 - 命令行/守护进程模式
+
+不导入 PyQt5，适合 NAS、服务器等没有图形界面的机器，也可作为 systemd 服务运行。
+
+用法示例：
+
+    python daemon.py /mnt/usb1/keep.bin /mnt/usb2/keep.bin --interval 60
+    python daemon.py --config /etc/hdd-keepalive.json
+
+配置文件为 JSON，顶层的 interval / duration / engine / adaptive / max_interval / skip_busy /
+sentinel / sentinel_size / write / write_fsync / write_budget / write_fsyncs_per_hour 作为默认值，
+targets 中每一项可以是路径字符串，也可以是带单独参数的对象：
+
+    {
+        "interval": 60,
+        "duration": 0,
+        "engine": "auto",
+        "targets": [
+            "/mnt/usb1/keep.bin",
+            {"path": "/mnt/usb2/keep.bin", "interval": 30}
+        ]
+    }
+
+interval 单位为秒，duration 单位为分钟（0 为无限），与图形界面一致。
+adaptive 为 true 时以 interval 为起点自动探测休眠超时，间隔不超过 max_interval 秒。
+skip_busy 为 true 时，硬盘已有其它读写则跳过本次读取（Linux）。
+sentinel 为 true 时，path 可以是挂载点或其中任意路径，实际读取该挂载点上的
+哨兵文件（大小为 sentinel_size MB，不存在时自动创建）。
+write 为 true 时改为改写哨兵文件中的一个块（需同时开启 sentinel），用于只认写入的硬盘盒；
+同一硬盘每天最多写入 write_budget MB、每小时最多 fsync write_fsyncs_per_hour 次，
+write_fsync 为 false 时不主动落盘。
+read_timeout 为单次读取超时（秒），超时的目标标记为停滞，读取返回后自动恢复。
+recover 为 true（默认）时读取出错的目标标记为离线，按指数退避重试，硬盘重新挂载后一秒内恢复；
+为 false 时出错即停止该目标。
+health_interval 为健康检测的间隔（小时，0 为不检测）：读取成功后若已满间隔，在后台对目标文件做一次
+有界的顺序与随机读取测试，记录吞吐量和延迟走势，低于该硬盘自身基准时记录警告（见 health.py）。
+prefetch_dirs / prefetch_files 为路径列表：保活读取成功或硬盘正忙时，遍历 prefetch_dirs
+预热目录元数据，并预读 prefetch_files 中的文件（目录递归展开），总量不超过 prefetch_budget MB。
+group 为错峰调度的分组名：同组硬盘的读取相位互相错开，同一时间最多 --max-concurrent-reads 个读取，
+不指定时按所接的 USB hub / 控制器自动分组（见 stagger.py）；共用电源的硬盘可指定相同的 group。
+"""
+import os
+import sys
+import json
+import socket
+import signal
+import logging
+import argparse
+import threading
+
+from adaptive import AdaptiveInterval
+from eventlog import EventLog, default_log_dir
+from health import HealthHistory, HealthProbe, default_health_dir, format_sample
+from prefetch import DEFAULT_BUDGET as PREFETCH_BUDGET, Prefetcher
+from latency import format_latency
+from diskstats import device_key
+from read_engine import ENGINE_NAMES
+from sentinel import DEFAULT_SIZE as SENTINEL_SIZE, ensure_sentinel
+from write_engine import DEFAULT_BYTES_PER_DAY, DEFAULT_FSYNCS_PER_HOUR, WriteBudget, WriteEngine
+from scheduler import (DEFAULT_READ_TIMEOUT, SHUTDOWN_TIMEOUT, KeepAliveScheduler, KeepAliveTarget,
+                       ListenerGroup, SchedulerListener)
+from stagger import DEFAULT_CONCURRENCY, DEFAULT_JITTER, StaggerPolicy
+
+log = logging.getLogger("hdd-keepalive")
+
+DEFAULTS = {"interval": 60, "duration": 0, "engine": "auto",
+            "adaptive": False, "max_interval": 3600, "skip_busy": False,
+            "sentinel": False, "sentinel_size": SENTINEL_SIZE // (1024 * 1024),
+            "write": False, "write_fsync": True, "write_budget": DEFAULT_BYTES_PER_DAY // (1024 * 1024),
+            "write_fsyncs_per_hour": DEFAULT_FSYNCS_PER_HOUR, "read_timeout": DEFAULT_READ_TIMEOUT,
+            "prefetch_dirs": [], "prefetch_files": [],
+            "prefetch_budget": PREFETCH_BUDGET // (1024 * 1024), "group": None,
+            "recover": True, "health_interval": 0}
+
+
+class ConfigError(ValueError):
+    """配置无效"""
+
+
+def load_config(path):
+    """读取 JSON 配置文件，返回目标参数字典列表"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ConfigError(f"无法读取配置文件 {path}: {e}")
+    if not isinstance(data, dict) or not isinstance(data.get("targets"), list):
+        raise ConfigError("配置文件需要包含 targets 列表")
+
+    defaults = dict(DEFAULTS)
+    defaults.update({k: data[k] for k in DEFAULTS if k in data})
+    specs = []
+    for item in data["targets"]:
+        spec = dict(defaults)
+        if isinstance(item, str):
+            spec["path"] = item
+        elif isinstance(item, dict) and "path" in item:
+            spec.update(item)
+        else:
+            raise ConfigError(f"无效的目标配置: {item!r}")
+        specs.append(spec)
+    return specs
+
+
+def build_targets(specs, event_log_dir=None, health_dir=None):
+    """
+    根据参数字典创建保活目标
+
+    event_log_dir 不为 None 时为每个目标记录事件日志；health_dir 为健康检测历史目录。
+    """
+    targets = []
+    # 前面的目标已占用的物理设备：同一块硬盘上后来的目标会被合并，不必再为它创建哨兵文件
+    devices = set()
+    for spec in specs:
+        path = spec["path"]
+        if not os.path.exists(path):
+            raise ConfigError(f"文件不存在: {path}")
+        device = device_key(path)
+        try:
+            interval = int(spec["interval"])
+            duration = int(spec["duration"])
+            max_interval = int(spec["max_interval"])
+            sentinel_size = int(spec["sentinel_size"])
+            write_budget = int(spec["write_budget"])
+            write_fsyncs = int(spec["write_fsyncs_per_hour"])
+            read_timeout = float(spec["read_timeout"])
+            prefetch_budget = int(spec["prefetch_budget"])
+            health_interval = float(spec["health_interval"])
+        except (TypeError, ValueError):
+            raise ConfigError(f"{path}: interval/duration/max_interval/sentinel_size/write_budget/"
+                              f"write_fsyncs_per_hour/prefetch_budget 必须是整数，"
+                              f"read_timeout/health_interval 必须是数字")
+        if interval <= 0:
+            raise ConfigError(f"{path}: 间隔必须大于0")
+        if read_timeout <= 0:
+            raise ConfigError(f"{path}: 读取超时必须大于0")
+        if health_interval < 0:
+            raise ConfigError(f"{path}: 健康检测间隔不能为负数")
+        if spec["engine"] not in ENGINE_NAMES:
+            raise ConfigError(f"{path}: 未知的读取方式 {spec['engine']}")
+        if spec["write"] and not spec["sentinel"]:
+            raise ConfigError(f"{path}: 写入模式只能用于哨兵文件，请同时开启 sentinel")
+        if spec["sentinel"] and device is not None and device in devices:
+            log.warning("%s 与前面的目标位于同一块硬盘，不为它创建哨兵文件", path)
+        elif spec["sentinel"]:
+            try:
+                path = ensure_sentinel(path, sentinel_size * 1024 * 1024)
+            except (OSError, ValueError) as e:
+                raise ConfigError(f"{path}: 无法创建哨兵文件: {e}")
+        if device is not None:
+            devices.add(device)
+        engine = spec["engine"]
+        if spec["write"]:
+            try:
+                budget = WriteBudget.for_path(path, write_budget * 1024 * 1024, write_fsyncs)
+                engine = WriteEngine(budget, bool(spec["write_fsync"]), fallback=engine)
+            except ValueError as e:
+                raise ConfigError(f"{path}: {e}")
+        adaptive = None
+        if spec["adaptive"]:
+            adaptive = AdaptiveInterval(interval, minimum=min(5, interval),
+                                        maximum=max(interval, max_interval))
+        prefetch = None
+        prefetch_dirs, prefetch_files = spec["prefetch_dirs"], spec["prefetch_files"]
+        if not isinstance(prefetch_dirs, list) or not isinstance(prefetch_files, list):
+            raise ConfigError(f"{path}: prefetch_dirs/prefetch_files 必须是路径列表")
+        if prefetch_dirs or prefetch_files:
+            try:
+                prefetch = Prefetcher(prefetch_dirs, prefetch_files, prefetch_budget * 1024 * 1024)
+            except ValueError as e:
+                raise ConfigError(f"{path}: {e}")
+        event_log = None
+        if event_log_dir is not None:
+            try:
+                event_log = EventLog.for_target(path, event_log_dir)
+            except (OSError, ValueError) as e:
+                log.warning("%s: 无法打开事件日志: %s", path, e)
+        health = None
+        if health_interval > 0:
+            health = HealthProbe(path, HealthHistory.for_target(path, health_dir),
+                                 health_interval * 3600, on_result=log_health)
+        group = spec["group"]
+        if group is not None and not isinstance(group, str):
+            raise ConfigError(f"{path}: group 必须是字符串")
+        target = KeepAliveTarget(path, interval, duration * 60, engine, adaptive,
+                                 skip_busy=bool(spec["skip_busy"]), event_log=event_log,
+                                 read_timeout=read_timeout, prefetch=prefetch, group=group,
+                                 recover=bool(spec["recover"]), health=health)
+        if spec["skip_busy"] and target.busy_probe is None:
+            log.warning("%s: 无法确定所在块设备，忙时跳过不生效", path)
+        targets.append(target)
+    return targets
+
+
+def log_health(probe, sample):
+    """健康检测完成（在检测线程中调用）"""
+    if probe.degraded:
+        log.warning("%s 性能低于自身基准：%s", probe.path, "；".join(probe.degraded))
+    else:
+        log.info("%s 健康检测：%s，随机读取 %d 次%s", probe.path, format_sample(sample),
+                 sample["random_reads"], "" if probe.baseline is not None else "（基准尚未建立）")
+
+
+def sd_notify(message):
+    """向 systemd 报告状态（仅在 Type=notify 服务中生效）"""
+    address = os.environ.get("NOTIFY_SOCKET")
+    if not address or not hasattr(socket, "AF_UNIX"):
+        return
+    if address.startswith("@"):
+        address = "\0" + address[1:]
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.sendto(message.encode(), address)
+    except OSError:
+        pass
+
+
+class DaemonListener(SchedulerListener):
+    """把调度事件写入日志，所有目标结束后通知主线程退出"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.active = 0
+        self.failed = 0
+        self._intervals = {}
+        self._offline = set()
+        self._lock = threading.Lock()
+
+    def on_started(self, target):
+        with self._lock:
+            self.active += 1
+            self._intervals[target.id] = target.interval
+        log.info("开始保活 %s（间隔 %s 秒%s）", target.path, target.interval,
+                 "，自适应" if target.adaptive is not None else "")
+        engine = target.engine
+        if isinstance(engine, WriteEngine):
+            per_day = engine.block_size * 86400 / target.interval
+            log.info("%s 写入模式：每次 %d 字节%s，预计每天 %.1f MB（预算 %.0f MB）",
+                     target.path, engine.block_size, "并 fsync" if engine.fsync else "",
+                     per_day / 1e6, engine.budget.bytes_per_day / (1024 * 1024))
+
+    def on_read(self, target):
+        latency = target.latency
+        adaptive = target.adaptive
+        if adaptive is not None and adaptive.interval != self._intervals.get(target.id):
+            self._intervals[target.id] = adaptive.interval
+            log.info("%s 自适应间隔调整为 %.0f 秒（%s）", target.path, adaptive.interval,
+                     "已收敛" if adaptive.settled else "探测中")
+        if latency.last_spinup:
+            log.info("读取 %s 耗时 %s，硬盘刚被唤醒（累计 %d 次）",
+                     target.path, format_latency(latency.last_ns), latency.spinups)
+        else:
+            log.debug("读取 %s 第 %d 次，耗时 %s",
+                      target.path, target.count, format_latency(latency.last_ns))
+
+    def on_state_changed(self, target):
+        if target.stalled:
+            log.warning("读取 %s 超过 %.0f 秒未返回，硬盘可能已断开；暂停该目标直到读取返回",
+                        target.path, target.read_timeout)
+        elif target.offline:
+            with self._lock:
+                self._offline.add(target.id)
+            log.warning("%s 已离线，等待重新挂载或按退避时间重试", target.path)
+        elif target.state == "running":
+            with self._lock:
+                was_offline = target.id in self._offline
+                self._offline.discard(target.id)
+            if was_offline:
+                log.info("%s 重新可读，恢复保活", target.path)
+            else:
+                log.info("%s 的读取已返回，恢复保活", target.path)
+
+    def on_suppressed(self, target):
+        log.debug("%s 所在设备正忙，跳过读取（累计 %d 次）", target.path, target.suppressed)
+
+    def on_error(self, target, message):
+        if not target.offline:
+            # 离线的目标仍在调度中，不算失败
+            with self._lock:
+                self.failed += 1
+        log.error("读取 %s 出错: %s", target.path, message)
+
+    def on_finished(self, target):
+        latency = target.latency
+        jitter = target.jitter
+        log.info("停止保活 %s（读取 %d 次，跳过 %d 次，延迟 p50 %s / p99 %s，唤醒 %d 次，"
+                 "调度偏差 p50 %s / p99 %s / 最大 %s）",
+                 target.path, target.count, target.suppressed, format_latency(latency.p50),
+                 format_latency(latency.p99), latency.spinups, format_latency(jitter.percentile(50)),
+                 format_latency(jitter.percentile(99)), format_latency(jitter.max))
+        prefetch = target.prefetch
+        if prefetch is not None:
+            log.info("%s 预取 %d 次，遍历目录项 %d 个，预读 %.1f MB%s", target.path, prefetch.runs,
+                     prefetch.entries, prefetch.bytes_advised / (1024 * 1024),
+                     f"（最近一次失败: {prefetch.last_error}）" if prefetch.last_error else "")
+        health = target.health
+        if health is not None and (health.runs or health.last_error):
+            log.info("%s 健康检测 %d 次%s%s", target.path, health.runs,
+                     "，最近一次性能低于基准" if health.degraded else "",
+                     f"（最近一次失败: {health.last_error}）" if health.last_error else "")
+        engine = target.engine
+        if isinstance(engine, WriteEngine):
+            amplification = engine.amplification
+            log.info("%s 写入 %d 次共 %d 字节，fsync %d 次，超出预算改为读取 %d 次，写放大 %s",
+                     target.path, engine.writes, engine.bytes_written, engine.fsyncs,
+                     engine.budget_skips,
+                     "--" if amplification is None else "%.1fx" % amplification)
+        with self._lock:
+            self.active -= 1
+            if self.active == 0:
+                self.done.set()
+
+    def on_resumed(self, suspended):
+        log.info("系统从挂起中恢复（约 %.0f 秒），立即补读所有目标", suspended)
+
+    def on_stopped(self):
+        self.done.set()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="daemon.py", description="硬盘保活工具 - 命令行/守护进程模式")
+    parser.add_argument("paths", nargs="*", metavar="PATH",
+                        help="要保活的文件（--sentinel 时为挂载点或目录）")
+    parser.add_argument("-c", "--config", help="JSON 配置文件")
+    parser.add_argument("-i", "--interval", type=int, default=DEFAULTS["interval"],
+                        help="读取间隔（秒），默认 %(default)s")
+    parser.add_argument("-d", "--duration", type=int, default=DEFAULTS["duration"],
+                        help="总运行时间（分钟），0 为无限")
+    parser.add_argument("-e", "--engine", choices=ENGINE_NAMES, default=DEFAULTS["engine"],
+                        help="读取方式，默认 %(default)s")
+    parser.add_argument("-a", "--adaptive", action="store_true",
+                        help="自适应间隔：以 --interval 为起点探测硬盘休眠超时")
+    parser.add_argument("--max-interval", type=int, default=DEFAULTS["max_interval"],
+                        help="自适应模式的最大间隔（秒），默认 %(default)s")
+    parser.add_argument("-s", "--skip-busy", action="store_true",
+                        help="硬盘已有其它读写时跳过本次读取（Linux）")
+    parser.add_argument("--sentinel", action="store_true",
+                        help="在 PATH 所在挂载点创建并读取专用哨兵文件")
+    parser.add_argument("--sentinel-size", type=int, default=DEFAULTS["sentinel_size"],
+                        help="哨兵文件大小（MB），默认 %(default)s")
+    parser.add_argument("-w", "--write", action="store_true",
+                        help="改写哨兵文件中的一个块代替读取（需要 --sentinel），用于只认写入的硬盘盒")
+    parser.add_argument("--no-write-fsync", action="store_true", help="写入模式下不主动 fsync")
+    parser.add_argument("--write-budget", type=int, default=DEFAULTS["write_budget"],
+                        help="写入模式下每块硬盘每天最多写入的 MB 数，默认 %(default)s")
+    parser.add_argument("--write-fsyncs-per-hour", type=int,
+                        default=DEFAULTS["write_fsyncs_per_hour"],
+                        help="写入模式下每块硬盘每小时最多 fsync 次数，默认 %(default)s")
+    parser.add_argument("--read-timeout", type=float, default=DEFAULTS["read_timeout"],
+                        help="单次读取超时（秒），超时的硬盘标记为停滞，默认 %(default)s")
+    parser.add_argument("--prefetch-dir", action="append", default=[], metavar="DIR",
+                        help="读取成功或硬盘正忙时预热该目录树的元数据，可重复指定")
+    parser.add_argument("--prefetch-file", action="append", default=[], metavar="PATH",
+                        help="读取成功或硬盘正忙时预读该文件（目录则递归展开），可重复指定")
+    parser.add_argument("--prefetch-budget", type=int, default=DEFAULTS["prefetch_budget"],
+                        help="每次预读文件内容的上限（MB），默认 %(default)s")
+    parser.add_argument("--no-recover", action="store_true",
+                        help="读取出错即停止该目标，不进入离线状态重试")
+    parser.add_argument("--health-interval", type=float, default=DEFAULTS["health_interval"],
+                        help="健康检测间隔（小时），如 24 为每天一次，默认 0 不检测")
+    parser.add_argument("--health-dir", default=default_health_dir(),
+                        help="健康检测历史目录，默认 %(default)s")
+    parser.add_argument("--group", help="命令行目标的错峰分组名，默认按设备拓扑自动分组")
+    parser.add_argument("--no-stagger", action="store_true",
+                        help="关闭错峰调度，各目标严格按固定间隔读取")
+    parser.add_argument("--jitter", type=float, default=DEFAULT_JITTER,
+                        help="读取随机提前的最大比例（相对间隔），默认 %(default)s")
+    parser.add_argument("--max-concurrent-reads", type=int, default=DEFAULT_CONCURRENCY,
+                        help="同组硬盘同时进行的读取数上限，默认 %(default)s")
+    parser.add_argument("--event-log-dir", default=default_log_dir(),
+                        help="事件日志目录，默认 %(default)s")
+    parser.add_argument("--no-event-log", action="store_true", help="不记录事件日志")
+    parser.add_argument("--metrics-port", type=int,
+                        help="在该端口提供 OpenMetrics 格式的 /metrics，默认不开启")
+    parser.add_argument("--metrics-address", default="127.0.0.1",
+                        help="指标端点监听地址，默认 %(default)s")
+    parser.add_argument("-v", "--verbose", action="store_true", help="记录每一次读取")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s")
+
+    specs = []
+    if args.config:
+        try:
+            specs.extend(load_config(args.config))
+        except ConfigError as e:
+            log.error("%s", e)
+            return 2
+    cli_defaults = {"interval": args.interval, "duration": args.duration, "engine": args.engine,
+                    "adaptive": args.adaptive, "max_interval": args.max_interval,
+                    "skip_busy": args.skip_busy, "sentinel": args.sentinel,
+                    "sentinel_size": args.sentinel_size, "write": args.write,
+                    "write_fsync": not args.no_write_fsync, "write_budget": args.write_budget,
+                    "write_fsyncs_per_hour": args.write_fsyncs_per_hour,
+                    "read_timeout": args.read_timeout, "prefetch_dirs": args.prefetch_dir,
+                    "prefetch_files": args.prefetch_file, "prefetch_budget": args.prefetch_budget,
+                    "group": args.group, "recover": not args.no_recover,
+                    "health_interval": args.health_interval}
+    specs.extend(dict(cli_defaults, path=path) for path in args.paths)
+    if not specs:
+        log.error("没有指定任何目标，请提供文件路径或 --config")
+        return 2
+    try:
+        targets = build_targets(specs, None if args.no_event_log else args.event_log_dir,
+                                args.health_dir)
+    except (ConfigError, ValueError) as e:
+        log.error("%s", e)
+        return 2
+
+    policy = None
+    if not args.no_stagger:
+        try:
+            policy = StaggerPolicy(args.jitter, args.max_concurrent_reads)
+        except ValueError as e:
+            log.error("%s", e)
+            return 2
+
+    listener = DaemonListener()
+    metrics_server = None
+    if args.metrics_port is not None:
+        from metrics import MetricsListener, MetricsServer
+        metrics = MetricsListener()
+        try:
+            metrics_server = MetricsServer(metrics, args.metrics_port, args.metrics_address)
+        except OSError as e:
+            log.error("无法监听 %s:%d: %s", args.metrics_address, args.metrics_port, e)
+            return 2
+        scheduler = KeepAliveScheduler(ListenerGroup(listener, metrics), policy=policy)
+        metrics.scheduler = scheduler
+        metrics_server.start()
+        log.info("指标端点 http://%s:%d/metrics", args.metrics_address, metrics_server.port)
+    else:
+        scheduler = KeepAliveScheduler(listener, policy=policy)
+
+    def handle_signal(signum, frame):
+        log.info("收到信号 %d，正在退出", signum)
+        scheduler.stop()
+        # 调度线程可能尚未启动，不会回调 on_stopped
+        listener.done.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    # 先加入所有目标再启动调度线程：否则先加入的目标若很快结束（如 --count 1），
+    # 活动目标数会在其余目标加入前降到 0，守护进程提前退出
+    added = 0
+    for target in targets:
+        existing = scheduler.same_device(target)
+        if existing is not None:
+            # 同一块硬盘只需一个目标读取
+            discarded = scheduler.merge(existing, target)
+            log.warning("%s 与 %s 位于同一块硬盘，不再重复读取（间隔 %.0f 秒）",
+                        target.path, existing.path, existing.interval)
+            if discarded:
+                log.warning("%s 的以下设置未生效：%s", target.path, "，".join(discarded))
+            continue
+        scheduler.add(target)
+        added += 1
+    if not listener.done.is_set():
+        scheduler.start()
+    sd_notify("READY=1")
+
+    # POSIX 上无超时等待可被信号打断；Windows 需要带超时等待才能响应 Ctrl+C
+    timeout = 1.0 if os.name == "nt" else None
+    while not listener.done.wait(timeout):
+        pass
+    sd_notify("STOPPING=1")
+    # 调度线程在等待条件变量，stop() 后立即退出；进行中的读取最多再等 SHUTDOWN_TIMEOUT 秒
+    clean = scheduler.shutdown(SHUTDOWN_TIMEOUT)
+    if not clean:
+        log.warning("仍有读取未在 %.0f 秒内返回，相应目标的事件日志留给进程退出时回收", SHUTDOWN_TIMEOUT)
+    if metrics_server is not None:
+        metrics_server.stop()
+    if policy is not None:
+        for gate in policy.gates():
+            if gate.deferred:
+                log.info("分组 %s：%d 次读取排队等待同组读取结束，其中 %d 次等到最晚时间后强制开始",
+                         gate.name, gate.deferred, gate.forced)
+    return 1 if listener.failed == added else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+块设备活动检测 - 硬盘正忙时跳过保活读取（Linux）
+
+通过 os.stat().st_dev 找到目标文件所在的块设备（/sys/dev/block/主:次），
+分区会归到其所属的整块磁盘，再读取 /sys/block/<设备>/stat 中的扇区计数。
+两次采样之间计数有变化，说明期间设备上已有其它 I/O，硬盘必然醒着。
+
+无法解析设备的情况（Windows、btrfs 等匿名设备号、网络文件系统）返回 None，
+调用方照常读取即可。
+"""
+import os
+
+SYS_DEV_BLOCK = "/sys/dev/block"
+SYS_BLOCK = "/sys/block"
+
+
+def resolve_device_path(path):
+    """
+    返回文件所在整块磁盘在 sysfs 中的真实路径，无法解析时返回 None
+
+    例如 /sys/devices/pci0000:00/0000:00:14.0/usb2/2-1/2-1.3/.../block/sdb，
+    路径中的各级目录反映了磁盘挂在哪个控制器、哪个 USB hub 上。
+    """
+    if not hasattr(os, "major"):
+        return None
+    try:
+        dev = os.stat(path).st_dev
+    except OSError:
+        return None
+    node = os.path.join(SYS_DEV_BLOCK, f"{os.major(dev)}:{os.minor(dev)}")
+    if not os.path.exists(node):
+        return None
+    real = os.path.realpath(node)
+    if os.path.exists(os.path.join(real, "partition")):
+        real = os.path.dirname(real)
+    return real
+
+
+def resolve_block_device(path):
+    """返回文件所在的整块磁盘名（如 "sda"），无法解析时返回 None"""
+    real = resolve_device_path(path)
+    return None if real is None else os.path.basename(real)
+
+
+def device_key(path):
+    """
+    标识文件所在的物理设备，用于同一硬盘上的目标去重
+
+    能解析到块设备时为整块磁盘名（同一硬盘的不同分区相同），否则退回 st_dev
+    （Windows 上为卷序列号，tmpfs、网络文件系统为匿名设备号）；无法访问时返回 None。
+    """
+    device = resolve_block_device(path)
+    if device is not None:
+        return device
+    try:
+        return f"st_dev:{os.stat(path).st_dev}"
+    except OSError:
+        return None
+
+
+# /sys/block/<设备>/stat 中的扇区固定按 512 字节计，与设备实际扇区大小无关
+SECTOR_SIZE = 512
+
+
+def _read_sectors(device):
+    """返回设备累计 (读扇区数, 写扇区数)，失败时返回 None"""
+    try:
+        with open(os.path.join(SYS_BLOCK, device, "stat"), "r") as f:
+            fields = f.read().split()
+        # 字段 3 / 7 分别为读、写扇区数
+        return int(fields[2]), int(fields[6])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def read_sector_counter(device):
+    """读取设备累计读写扇区数，失败时返回 None"""
+    sectors = _read_sectors(device)
+    return None if sectors is None else sectors[0] + sectors[1]
+
+
+def read_written_sectors(device):
+    """读取设备累计写扇区数，失败时返回 None"""
+    sectors = _read_sectors(device)
+    return None if sectors is None else sectors[1]
+
+
+class DiskActivityProbe:
+    """对单个块设备做前后两次采样，判断其间是否有 I/O"""
+
+    def __init__(self, device):
+        self.device = device
+        self._baseline = None
+
+    @classmethod
+    def for_path(cls, path):
+        """为文件所在设备创建探针，不支持时返回 None"""
+        device = resolve_block_device(path)
+        if device is None or read_sector_counter(device) is None:
+            return None
+        return cls(device)
+
+    def mark(self):
+        """记录当前计数作为比较基准"""
+        self._baseline = read_sector_counter(self.device)
+
+    def reset(self):
+        """丢弃基准（例如系统挂起后，旧基准已无意义）"""
+        self._baseline = None
+
+    def busy(self):
+        """自上次 mark() 以来设备是否有过 I/O；同时清除基准"""
+        baseline, self._baseline = self._baseline, None
+        if baseline is None:
+            return False
+        current = read_sector_counter(self.device)
+        return current is not None and current != baseline
@@ -0,0 +1,278 @@
+"""
+事件日志 - 每个目标一个定长记录的内存映射环形文件
+
+每次保活读取（或跳过、出错）写入一条 8 字节记录：
+
+    u32 时间戳（Unix 秒）
+    u32 低 8 位为标志位，高 24 位为读取延迟（单位 10µs，上限约 167 秒）
+
+文件大小在创建时固定（默认 131072 条，约 1MB，60 秒间隔约可记录 3 个月），
+写满后从头覆盖最旧的记录；已有的文件沿用创建时的容量。几十块硬盘也只占几十 MB，
+写入只是一次内存拷贝，不会拖慢调度线程。
+
+读取接口按需解析记录，不会把整个文件载入内存；rollup() 提供按小时/按天汇总。
+"""
+import os
+import sys
+import mmap
+import time
+import struct
+import hashlib
+
+MAGIC = b"HKEL"
+VERSION = 1
+HEADER_SIZE = 512
+DEFAULT_CAPACITY = 131072
+
+# 魔数、版本、记录大小、容量、累计写入条数
+_HEADER = struct.Struct("<4sHHIQ")
+_HEAD_OFFSET = 12
+_HEAD = struct.Struct("<Q")
+_PATH_OFFSET = 32
+_RECORD = struct.Struct("<II")
+
+# 标志位
+OUTCOME_OK = 0
+OUTCOME_ERROR = 1
+FLAG_SUPPRESSED = 0x04
+FLAG_SPINUP = 0x08
+_OUTCOME_MASK = 0x03
+
+_LATENCY_UNIT_NS = 10_000
+_LATENCY_MAX = (1 << 24) - 1
+
+
+def default_log_dir():
+    """各平台的默认日志目录"""
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "硬盘保活工具", "events")
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(base, "hdd-keepalive", "events")
+
+
+def log_file_for(target_path, directory=None):
+    """目标对应的日志文件路径（按绝对路径哈希命名）"""
+    digest = hashlib.sha1(os.path.abspath(target_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(directory or default_log_dir(), f"{digest}.evlog")
+
+
+class EventRecord:
+    """一条读取事件"""
+
+    __slots__ = ("timestamp", "latency_ns", "flags")
+
+    def __init__(self, timestamp, latency_ns, flags):
+        self.timestamp = timestamp
+        self.latency_ns = latency_ns
+        self.flags = flags
+
+    @property
+    def outcome(self):
+        return self.flags & _OUTCOME_MASK
+
+    @property
+    def ok(self):
+        return self.outcome == OUTCOME_OK
+
+    @property
+    def suppressed(self):
+        return bool(self.flags & FLAG_SUPPRESSED)
+
+    @property
+    def spinup(self):
+        return bool(self.flags & FLAG_SPINUP)
+
+
+class EventLog:
+    """单个目标的环形事件日志"""
+
+    def __init__(self, file_path, target_path=None, capacity=DEFAULT_CAPACITY, readonly=False):
+        self.file_path = file_path
+        self.readonly = readonly
+        if readonly:
+            self._file = open(file_path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._file, self._map = self._open_writable(file_path, target_path, capacity)
+        magic, version, record_size, self.capacity, _ = _HEADER.unpack_from(self._map, 0)
+        if (magic != MAGIC or version != VERSION or record_size != _RECORD.size
+                or len(self._map) < HEADER_SIZE + self.capacity * _RECORD.size):
+            self.close()
+            raise ValueError(f"不是有效的事件日志文件: {file_path}")
+        raw_path = self._map[_PATH_OFFSET:HEADER_SIZE].split(b"\0", 1)[0]
+        self.target_path = raw_path.decode("utf-8", "replace")
+
+    @classmethod
+    def for_target(cls, target_path, directory=None, capacity=DEFAULT_CAPACITY):
+        """打开（必要时创建）目标的日志文件用于写入"""
+        return cls(log_file_for(target_path, directory), target_path, capacity)
+
+    @staticmethod
+    def _open_writable(file_path, target_path, capacity):
+        size = HEADER_SIZE + capacity * _RECORD.size
+        exists = os.path.exists(file_path) and os.path.getsize(file_path) >= HEADER_SIZE
+        if not exists:
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+            with open(file_path, "wb") as f:
+                f.truncate(size)
+        f = open(file_path, "r+b")
+        m = mmap.mmap(f.fileno(), 0)
+        if not exists:
+            _HEADER.pack_into(m, 0, MAGIC, VERSION, _RECORD.size, capacity, 0)
+            encoded = (target_path or "").encode("utf-8")[:HEADER_SIZE - _PATH_OFFSET - 1]
+            m[_PATH_OFFSET:_PATH_OFFSET + len(encoded)] = encoded
+        return f, m
+
+    @property
+    def written(self):
+        """累计写入条数（含已被覆盖的）"""
+        return _HEAD.unpack_from(self._map, _HEAD_OFFSET)[0]
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def append(self, timestamp, latency_ns=0, outcome=OUTCOME_OK, suppressed=False, spinup=False):
+        """追加一条记录"""
+        head = self.written
+        latency = min(_LATENCY_MAX, latency_ns // _LATENCY_UNIT_NS)
+        flags = outcome & _OUTCOME_MASK
+        if suppressed:
+            flags |= FLAG_SUPPRESSED
+        if spinup:
+            flags |= FLAG_SPINUP
+        offset = HEADER_SIZE + (head % self.capacity) * _RECORD.size
+        _RECORD.pack_into(self._map, offset, int(timestamp), (latency << 8) | flags)
+        # 先写记录再更新计数，中途崩溃最多丢失最后一条
+        _HEAD.pack_into(self._map, _HEAD_OFFSET, head + 1)
+
+    def _record_at(self, index):
+        """第 index 条（0 为现存最旧的）记录"""
+        head = self.written
+        start = head - len(self)
+        offset = HEADER_SIZE + ((start + index) % self.capacity) * _RECORD.size
+        timestamp, packed = _RECORD.unpack_from(self._map, offset)
+        return EventRecord(timestamp, (packed >> 8) * _LATENCY_UNIT_NS, packed & 0xFF)
+
+    def __iter__(self):
+        """按时间顺序逐条迭代"""
+        for index in range(len(self)):
+            yield self._record_at(index)
+
+    def iter_recent(self, since):
+        """从最新往前迭代，遇到早于 since 的记录即停止"""
+        for index in range(len(self) - 1, -1, -1):
+            record = self._record_at(index)
+            if record.timestamp < since:
+                return
+            yield record
+
+    def flush(self):
+        if not self.readonly:
+            self._map.flush()
+
+    def close(self):
+        if self._map is not None:
+            self.flush()
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def open_logs(directory=None):
+    """以只读方式打开目录下的所有事件日志"""
+    directory = directory or default_log_dir()
+    logs = []
+    if not os.path.isdir(directory):
+        return logs
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".evlog"):
+            try:
+                logs.append(EventLog(os.path.join(directory, name), readonly=True))
+            except (OSError, ValueError):
+                continue
+    return logs
+
+
+class Rollup:
+    """一个时间段内的汇总"""
+
+    __slots__ = ("issued", "suppressed", "errors", "spinups", "latency_sum_ns", "latency_max_ns")
+
+    def __init__(self):
+        self.issued = 0
+        self.suppressed = 0
+        self.errors = 0
+        self.spinups = 0
+        self.latency_sum_ns = 0
+        self.latency_max_ns = 0
+
+    def add(self, record):
+        if record.suppressed:
+            self.suppressed += 1
+        elif not record.ok:
+            self.errors += 1
+        else:
+            self.issued += 1
+            self.latency_sum_ns += record.latency_ns
+            self.latency_max_ns = max(self.latency_max_ns, record.latency_ns)
+            if record.spinup:
+                self.spinups += 1
+
+    @property
+    def latency_mean_ns(self):
+        return self.latency_sum_ns // self.issued if self.issued else None
+
+
+def rollup(records, period="hour"):
+    """
+    按本地时间的小时或天汇总记录
+
+    返回按时间排序的 [(时段标签, Rollup)]，标签如 "2025-11-02 14:00" 或 "2025-11-02"。
+    """
+    if period not in ("hour", "day"):
+        raise ValueError(f"未知的汇总周期: {period}")
+    fmt = "%Y-%m-%d %H:00" if period == "hour" else "%Y-%m-%d"
+    buckets = {}
+    for record in records:
+        key = time.strftime(fmt, time.localtime(record.timestamp))
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = Rollup()
+        bucket.add(record)
+    return sorted(buckets.items())
+
+
+def today_start():
+    """本地时间今天零点的时间戳"""
+    now = time.localtime()
+    return time.mktime((now.tm_year, now.tm_mon, now.tm_mday, 0, 0, 0, 0, 0, -1))
+
+
+def _main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="查看保活事件日志的汇总")
+    parser.add_argument("--dir", help="日志目录，默认 %s" % default_log_dir())
+    parser.add_argument("--period", choices=("hour", "day"), default="day")
+    args = parser.parse_args(argv)
+
+    logs = open_logs(args.dir)
+    if not logs:
+        print("没有找到事件日志")
+        return 1
+    for log in logs:
+        print(f"{log.target_path}（{len(log)} 条记录）")
+        for label, bucket in rollup(log, args.period):
+            mean = bucket.latency_mean_ns
+            print(f"  {label}  读取 {bucket.issued:>5}  跳过 {bucket.suppressed:>5}  "
+                  f"错误 {bucket.errors:>3}  唤醒 {bucket.spinups:>3}  "
+                  f"平均延迟 {'--' if mean is None else '%.1f ms' % (mean / 1e6)}")
+        log.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
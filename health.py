@@ -0,0 +1,323 @@
+"""
+健康检测 - 定期对硬盘做一次小规模读取基准，跟踪性能走势
+
+保活读取本来就定期访问每块硬盘，顺便可以发现硬盘在变慢。HealthProbe 每隔
+interval 秒（默认一天）对目标文件（哨兵文件或保活文件）做一次有界的测试：
+
+- 顺序读取：从文件开头按 1MB 块读取，最多 sequential_bytes 字节，计算吞吐量；
+- 随机读取：random_reads 次 4K 随机读取，记录延迟的 p50/p99/最大值。
+
+两者都使用与保活读取相同的绕过缓存的读取引擎（见 read_engine.py），
+整次测试不超过 time_limit 秒。结果追加到按目标区分的历史文件（JSON Lines），
+以最初 BASELINE_SAMPLES 次结果的中位数作为该硬盘自己的基准：
+吞吐量低于基准的 (1 - THROUGHPUT_DROP) 倍，或随机读取 p99 高于基准的
+LATENCY_RISE 倍时标记为性能下降。
+
+测试只在一次保活读取成功之后触发（硬盘此时已醒，不会额外唤醒），
+在单独的后台线程中执行，不占用调度线程、读取线程池和错峰令牌；
+下一次保活读取至少在一个间隔之后，有界的测试通常早已结束。
+
+查看历史：
+
+    python health.py
+    python health.py --dir ~/.local/state/hdd-keepalive/health
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+
+from eventlog import default_log_dir
+from read_engine import BLOCK_SIZE, create_read_engine
+
+DEFAULT_INTERVAL = 86400.0
+DEFAULT_SEQUENTIAL_BYTES = 64 * 1024 * 1024
+DEFAULT_RANDOM_READS = 32
+DEFAULT_TIME_LIMIT = 10.0
+
+SEQUENTIAL_BLOCK = 1024 * 1024
+
+# 基准取最初几次结果的中位数；历史文件最多保留的条数
+BASELINE_SAMPLES = 5
+MAX_SAMPLES = 400
+
+# 判定性能下降的阈值；延迟的升高还需超过 LATENCY_FLOOR_NS，避免亚毫秒级的抖动被误判
+THROUGHPUT_DROP = 0.3
+LATENCY_RISE = 2.0
+LATENCY_FLOOR_NS = 1_000_000
+
+SAMPLE_FIELDS = ("timestamp", "engine", "sequential_bytes", "sequential_seconds", "throughput",
+                 "random_reads", "p50_ns", "p99_ns", "max_ns")
+
+
+def default_health_dir():
+    """各平台的默认历史目录，与事件日志目录并列"""
+    return os.path.join(os.path.dirname(default_log_dir()), "health")
+
+
+def history_file_for(target_path, directory=None):
+    """目标对应的历史文件路径（按绝对路径哈希命名）"""
+    digest = hashlib.sha1(os.path.abspath(target_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(directory or default_health_dir(), f"{digest}.jsonl")
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))
+    return sorted_values[index]
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def measure(path, sequential_bytes=DEFAULT_SEQUENTIAL_BYTES, random_reads=DEFAULT_RANDOM_READS,
+            time_limit=DEFAULT_TIME_LIMIT, engine="auto"):
+    """同步执行一次顺序 + 随机读取测试，返回结果字典（字段见 SAMPLE_FIELDS）"""
+    deadline = time.perf_counter() + time_limit
+    size = os.path.getsize(path)
+
+    sequential = create_read_engine(engine, SEQUENTIAL_BLOCK, "rotate")
+    try:
+        blocks = max(1, min(sequential_bytes, size) // SEQUENTIAL_BLOCK)
+        total = 0
+        begin = time.perf_counter()
+        for _ in range(blocks):
+            total += sequential.read(path)
+            if time.perf_counter() >= deadline:
+                break
+        seconds = time.perf_counter() - begin
+        engine_name = getattr(sequential, "active", sequential.name)
+    finally:
+        sequential.close()
+
+    latencies = []
+    scattered = create_read_engine(engine, BLOCK_SIZE, "random")
+    try:
+        for _ in range(random_reads):
+            if time.perf_counter() >= deadline:
+                break
+            begin = time.perf_counter_ns()
+            scattered.read(path)
+            latencies.append(time.perf_counter_ns() - begin)
+    finally:
+        scattered.close()
+    latencies.sort()
+
+    return {
+        "timestamp": time.time(),
+        "engine": engine_name,
+        "sequential_bytes": total,
+        "sequential_seconds": seconds,
+        "throughput": total / seconds if seconds > 0 else None,
+        "random_reads": len(latencies),
+        "p50_ns": _percentile(latencies, 50),
+        "p99_ns": _percentile(latencies, 99),
+        "max_ns": latencies[-1] if latencies else None,
+    }
+
+
+def baseline_of(samples):
+    """同一读取引擎最初 BASELINE_SAMPLES 次结果的中位数，次数不足时为 None"""
+    if not samples:
+        return None
+    engine = samples[-1]["engine"]
+    early = [s for s in samples if s["engine"] == engine][:BASELINE_SAMPLES]
+    if len(early) < BASELINE_SAMPLES:
+        return None
+    baseline = {"engine": engine, "samples": len(early)}
+    for key in ("throughput", "p50_ns", "p99_ns"):
+        values = [s[key] for s in early if s.get(key) is not None]
+        baseline[key] = _median(values) if values else None
+    return baseline
+
+
+def degradation(sample, baseline):
+    """与基准比较，返回性能下降的说明列表（没有下降时为空）"""
+    if baseline is None or sample["engine"] != baseline["engine"]:
+        return []
+    reasons = []
+    if (sample["throughput"] is not None and baseline["throughput"]
+            and sample["throughput"] < baseline["throughput"] * (1 - THROUGHPUT_DROP)):
+        reasons.append(f"顺序读取 {sample['throughput'] / 1e6:.1f} MB/s，"
+                       f"基准 {baseline['throughput'] / 1e6:.1f} MB/s")
+    if (sample["p99_ns"] is not None and baseline["p99_ns"]
+            and sample["p99_ns"] > max(baseline["p99_ns"] * LATENCY_RISE,
+                                       baseline["p99_ns"] + LATENCY_FLOOR_NS)):
+        reasons.append(f"随机读取 p99 {sample['p99_ns'] / 1e6:.1f} ms，"
+                       f"基准 {baseline['p99_ns'] / 1e6:.1f} ms")
+    return reasons
+
+
+class HealthHistory:
+    """单个目标的测试历史，每行一条 JSON 记录"""
+
+    def __init__(self, file_path, target_path=None):
+        self.file_path = file_path
+        self.target_path = target_path
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_target(cls, target_path, directory=None):
+        return cls(history_file_for(target_path, directory), target_path)
+
+    def samples(self):
+        """按时间顺序返回所有记录，无法解析的行被忽略"""
+        samples = []
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        sample = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(sample, dict) and all(key in sample for key in SAMPLE_FIELDS):
+                        samples.append(sample)
+                        self.target_path = self.target_path or sample.get("path")
+        except OSError:
+            pass
+        return samples
+
+    def append(self, sample):
+        """追加一条记录；超过 MAX_SAMPLES 条时保留最初的基准记录和最近的记录"""
+        record = dict(sample, path=self.target_path)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            samples = self.samples()
+            if len(samples) > MAX_SAMPLES:
+                kept = samples[:BASELINE_SAMPLES] + samples[-(MAX_SAMPLES - BASELINE_SAMPLES):]
+                temp = self.file_path + ".tmp"
+                with open(temp, "w", encoding="utf-8") as f:
+                    for s in kept:
+                        f.write(json.dumps(s, ensure_ascii=False) + "\n")
+                os.replace(temp, self.file_path)
+
+    def last_timestamp(self):
+        samples = self.samples()
+        return samples[-1]["timestamp"] if samples else None
+
+
+class HealthProbe:
+    """
+    单个目标的定期健康检测
+
+    on_result(probe, sample) 在测试线程中调用，此时 probe.degraded 已更新。
+    """
+
+    def __init__(self, path, history=None, interval=DEFAULT_INTERVAL,
+                 sequential_bytes=DEFAULT_SEQUENTIAL_BYTES, random_reads=DEFAULT_RANDOM_READS,
+                 time_limit=DEFAULT_TIME_LIMIT, on_result=None, clock=time.time):
+        if interval <= 0:
+            raise ValueError("检测间隔必须大于0")
+        self.path = path
+        self.history = history
+        self.interval = interval
+        self.sequential_bytes = sequential_bytes
+        self.random_reads = random_reads
+        self.time_limit = time_limit
+        self.on_result = on_result
+        self.clock = clock
+        self.runs = 0
+        self.last = None
+        self.baseline = None
+        self.degraded = []
+        self.last_error = None
+        # 间隔按墙上时间计算，重启后从历史中最后一次测试起算
+        self._last_run = history.last_timestamp() if history is not None else None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def trigger(self):
+        """距上次测试已满 interval 时在后台开始一次测试，返回是否已开始"""
+        with self._lock:
+            now = self.clock()
+            if self.running:
+                return False
+            if self._last_run is not None and now - self._last_run < self.interval:
+                return False
+            self._last_run = now
+            self._thread = threading.Thread(target=self._run_safely, name="keepalive-health")
+            self._thread.daemon = True
+            self._thread.start()
+            return True
+
+    def _run_safely(self):
+        try:
+            self.run()
+            self.last_error = None
+        except Exception as e:
+            # 健康检测只是附加信息，失败不影响保活
+            self.last_error = str(e)
+
+    def run(self):
+        """同步执行一次测试并与基准比较，返回结果"""
+        sample = measure(self.path, self.sequential_bytes, self.random_reads, self.time_limit)
+        samples = [sample]
+        if self.history is not None:
+            self.history.append(sample)
+            samples = self.history.samples()
+        self.baseline = baseline_of(samples)
+        self.degraded = degradation(sample, self.baseline)
+        self.last = sample
+        self.runs += 1
+        if self.on_result is not None:
+            self.on_result(self, sample)
+        return sample
+
+
+def format_sample(sample):
+    throughput = sample["throughput"]
+    parts = [f"顺序 {'--' if throughput is None else '%.1f MB/s' % (throughput / 1e6)}"]
+    for key, label in (("p50_ns", "p50"), ("p99_ns", "p99"), ("max_ns", "最大")):
+        value = sample[key]
+        parts.append(f"{label} {'--' if value is None else '%.2f ms' % (value / 1e6)}")
+    return "，".join(parts)
+
+
+def _main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="查看硬盘健康检测的历史与走势")
+    parser.add_argument("--dir", help="历史目录，默认 %s" % default_health_dir())
+    parser.add_argument("--last", type=int, default=10, help="每个目标显示最近几次，默认 %(default)s")
+    args = parser.parse_args(argv)
+
+    directory = args.dir or default_health_dir()
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(".jsonl"))
+    except OSError:
+        names = []
+    if not names:
+        print("没有找到健康检测记录")
+        return 1
+    for name in names:
+        history = HealthHistory(os.path.join(directory, name))
+        samples = history.samples()
+        if not samples:
+            continue
+        baseline = baseline_of(samples)
+        print(f"{history.target_path}（{len(samples)} 次检测，读取方式 {samples[-1]['engine']}）")
+        if baseline is None:
+            print(f"  基准：检测满 {BASELINE_SAMPLES} 次后建立")
+        else:
+            print(f"  基准：{format_sample(dict(baseline, max_ns=None))}")
+        for sample in samples[-args.last:]:
+            stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(sample["timestamp"]))
+            reasons = degradation(sample, baseline)
+            print(f"  {stamp}  {format_sample(sample)}{'  ！性能下降' if reasons else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
@@ -0,0 +1,111 @@
+"""
+读取延迟统计 - 固定大小直方图与硬盘唤醒（spin-up）识别
+
+每次保活读取用 perf_counter_ns 计时后记入对数分桶直方图：每个 2 的幂区间
+再分 4 个子桶，覆盖约 1µs ~ 18 分钟，相对误差不超过 12.5%，
+内存占用固定，不随读取次数增长。
+
+硬盘已休眠时读取要等待电机重新起转，延迟会从微秒/毫秒级跳到秒级，
+超过阈值的读取记为一次唤醒事件。
+"""
+
+# 超过该延迟的读取视为硬盘从休眠中唤醒
+SPINUP_THRESHOLD_NS = 800_000_000
+
+_SUB_BUCKETS = 4
+_MIN_EXP = 10   # 2^10 ns ≈ 1µs
+_MAX_EXP = 40   # 2^40 ns ≈ 18 分钟
+_BUCKETS = (_MAX_EXP - _MIN_EXP + 1) * _SUB_BUCKETS
+
+
+def _bucket_index(value):
+    exp = value.bit_length() - 1
+    if exp < _MIN_EXP:
+        return 0
+    if exp > _MAX_EXP:
+        return _BUCKETS - 1
+    sub = (value >> (exp - 2)) & (_SUB_BUCKETS - 1)
+    return (exp - _MIN_EXP) * _SUB_BUCKETS + sub
+
+
+def _bucket_bounds(index):
+    exp = index // _SUB_BUCKETS + _MIN_EXP
+    sub = index % _SUB_BUCKETS
+    step = 1 << (exp - 2)
+    return (_SUB_BUCKETS + sub) * step, (_SUB_BUCKETS + sub + 1) * step
+
+
+class LatencyHistogram:
+    """固定大小的对数分桶延迟直方图（单位：纳秒）"""
+
+    __slots__ = ("counts", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        self.counts[_bucket_index(value)] += 1
+        self.total += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """估算第 q 百分位（0-100），无数据时返回 None"""
+        if not self.total:
+            return None
+        rank = max(1, int(self.total * q / 100.0 + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                low, high = _bucket_bounds(index)
+                return min(max((low + high) // 2, self.min), self.max)
+        return self.max
+
+    def buckets(self):
+        """非空桶列表 [(上界纳秒, 数量)]，用于导出"""
+        return [(_bucket_bounds(i)[1], c) for i, c in enumerate(self.counts) if c]
+
+
+class LatencyStats:
+    """单个目标的读取延迟统计与唤醒计数"""
+
+    def __init__(self, spinup_threshold_ns=SPINUP_THRESHOLD_NS):
+        self.spinup_threshold_ns = spinup_threshold_ns
+        self.histogram = LatencyHistogram()
+        self.spinups = 0
+        self.last_ns = None
+        self.last_spinup = False
+
+    def record(self, latency_ns):
+        """记录一次读取延迟，返回是否判定为唤醒"""
+        self.histogram.record(latency_ns)
+        self.last_ns = latency_ns
+        self.last_spinup = latency_ns >= self.spinup_threshold_ns
+        if self.last_spinup:
+            self.spinups += 1
+        return self.last_spinup
+
+    @property
+    def p50(self):
+        return self.histogram.percentile(50)
+
+    @property
+    def p99(self):
+        return self.histogram.percentile(99)
+
+
+def format_latency(ns):
+    """把纳秒格式化为易读字符串"""
+    if ns is None:
+        return "--"
+    if ns < 1_000_000:
+        return f"{ns / 1000:.0f} µs"
+    if ns < 1_000_000_000:
+        return f"{ns / 1_000_000:.1f} ms"
+    return f"{ns / 1_000_000_000:.2f} s"
@@ -1,14 +1,34 @@
 import sys
 import os
-import time
 import threading
+from collections import namedtuple
+from functools import lru_cache
+
+from startup import profile
+
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QLineEdit, QPushButton, 
                              QFileDialog, QMessageBox, QFrame, QSystemTrayIcon, 
-                             QMenu, QAction, QGroupBox)
-from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QObject
+                             QMenu, QAction, QGroupBox, QComboBox, QCheckBox,
+                             QTableView, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QObject, QEvent
 from PyQt5.QtGui import QIcon, QFont, QPalette, QColor
 
+profile.mark("导入 PyQt5")
+
+from adaptive import AdaptiveInterval
+from eventlog import EventLog, log_file_for, rollup, today_start
+from read_engine import create_read_engine
+from diskstats import device_key
+from sentinel import SENTINEL_NAME, ensure_sentinel
+from single_instance import InstanceServer, send_to_running
+from write_engine import WriteBudget, WriteEngine
+from scheduler import SHUTDOWN_TIMEOUT, TERMINAL_STATES, KeepAliveScheduler, KeepAliveTarget, SchedulerListener
+from stagger import StaggerPolicy
+from target_table import COL_PATH, TargetTableModel, target_row
+
+profile.mark("导入本地模块")
+
 # 解决Windows高DPI显示问题
 if hasattr(Qt, 'AA_EnableHighDpiScaling'):
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
@@ -16,50 +36,355 @@ if hasattr(Qt, 'AA_UseHighDpiPixmaps'):
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
 
 
+# 内置样式，styles.qss 不存在时使用
+DEFAULT_STYLESHEET = """
+            QMainWindow {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                                            stop:0 #f8f9fa, stop:1 #e9ecef);
+            }
+            
+            QWidget {
+                font-family: "Microsoft YaHei UI", "Segoe UI", "微软雅黑", sans-serif;
+            }
+            
+            #title {
+                color: #1a1a2e;
+                padding: 8px;
+                font-weight: 600;
+            }
+            
+            QGroupBox {
+                font-size: 12px;
+                font-weight: 600;
+                color: #2c3e50;
+                border: 1px solid #dfe4ea;
+                border-radius: 8px;
+                margin-top: 0px;
+                padding: 25px 15px 15px 15px;
+                background-color: white;
+            }
+            
+            QGroupBox::title {
+                subcontrol-origin: padding;
+                subcontrol-position: top left;
+                left: 10px;
+                top: 8px;
+                padding: 0;
+                background-color: transparent;
+            }
+            
+            #statusGroup {
+                background-color: white;
+                border: 1px solid #74b9ff;
+                padding: 25px 15px 18px 15px;
+            }
+            
+            #label {
+                color: #2c3e50;
+                font-size: 12px;
+                font-weight: 600;
+                padding: 3px 0;
+            }
+            
+            #hint {
+                color: #636e72;
+                font-size: 10px;
+                font-style: italic;
+            }
+            
+            #infoLabel {
+                color: #2d3436;
+                font-size: 12px;
+                padding: 6px 8px;
+                line-height: 1.5;
+                min-height: 24px;
+            }
+            
+            QLineEdit {
+                border: 1px solid #dfe6e9;
+                border-radius: 5px;
+                padding: 8px 10px;
+                font-size: 12px;
+                background-color: white;
+                color: #2d3436;
+            }
+            
+            QLineEdit:hover {
+                border: 1px solid #b2bec3;
+            }
+            
+            QLineEdit:focus {
+                border: 1px solid #0984e3;
+            }
+            
+            QLineEdit:disabled {
+                background-color: #f1f3f5;
+                color: #868e96;
+                border: 1px solid #dfe6e9;
+            }
+            
+            QComboBox {
+                border: 1px solid #dfe6e9;
+                border-radius: 5px;
+                padding: 6px 10px;
+                font-size: 12px;
+                background-color: white;
+                color: #2d3436;
+            }
+            
+            QComboBox:hover {
+                border: 1px solid #b2bec3;
+            }
+            
+            QComboBox:disabled {
+                background-color: #f1f3f5;
+                color: #868e96;
+            }
+            
+            QCheckBox {
+                color: #2c3e50;
+                font-size: 12px;
+                spacing: 6px;
+            }
+            
+            QPushButton {
+                border: none;
+                border-radius: 5px;
+                padding: 8px 16px;
+                font-size: 12px;
+                font-weight: 600;
+            }
+            
+            #browseButton {
+                background-color: #0984e3;
+                color: white;
+                min-height: 32px;
+            }
+            
+            #browseButton:hover {
+                background-color: #0770c4;
+            }
+            
+            #browseButton:disabled {
+                background-color: #b2bec3;
+                color: #dfe6e9;
+            }
+            
+            #startButton {
+                background-color: #00b894;
+                color: white;
+                font-size: 13px;
+            }
+            
+            #startButton:hover {
+                background-color: #00a383;
+            }
+            
+            #startButton:disabled {
+                background-color: #b2bec3;
+                color: #dfe6e9;
+            }
+            
+            #stopButton {
+                background-color: #d63031;
+                color: white;
+                font-size: 13px;
+            }
+            
+            #stopButton:hover {
+                background-color: #c0282a;
+            }
+            
+            #stopButton:disabled {
+                background-color: #b2bec3;
+                color: #dfe6e9;
+            }
+            
+            #targetTable {
+                border: 1px solid #dfe6e9;
+                border-radius: 5px;
+                font-size: 12px;
+                color: #2d3436;
+                background-color: white;
+                alternate-background-color: #f8f9fa;
+                selection-background-color: #dfefff;
+                selection-color: #2d3436;
+            }
+            
+            QHeaderView::section {
+                background-color: #f1f3f5;
+                color: #2c3e50;
+                border: none;
+                border-bottom: 1px solid #dfe6e9;
+                padding: 4px 6px;
+                font-size: 12px;
+                font-weight: 600;
+            }
+            
+            #statusText {
+                color: #2c3e50;
+                font-size: 13px;
+                font-weight: 600;
+                min-height: 24px;
+                line-height: 1.5;
+            }
+        """
+
+
+@lru_cache(maxsize=None)
+def read_stylesheet():
+    """读取 styles.qss，不存在时使用内置样式；结果缓存，重建窗口时不再读盘"""
+    qss_path = os.path.join(os.path.dirname(__file__), "styles.qss")
+    if os.path.exists(qss_path):
+        with open(qss_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    return DEFAULT_STYLESHEET
+
+
+def trim_heap():
+    """把已释放的堆内存归还给系统（glibc），其它平台上什么也不做"""
+    if not sys.platform.startswith("linux"):
+        return
+    try:
+        import ctypes
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+# 表格刷新间隔（毫秒）：事件再频繁，界面每秒最多刷新 4 次
+TABLE_REFRESH_MS = 250
+
+# 表单控件的当前值，释放窗口前保存、重建后恢复
+FormState = namedtuple("FormState", (
+    "path", "interval", "duration", "adaptive", "sentinel", "engine", "skip_busy", "header"))
+
+# 点击开始时从表单读取的目标设置；创建哨兵文件期间表单可能已被修改或释放
+TargetSettings = namedtuple("TargetSettings", ("interval", "duration", "engine", "adaptive", "skip_busy",
+                                               "sentinel"))
+
+
 class WorkerSignals(QObject):
-    """工作线程信号"""
-    update_count = pyqtSignal(int)
-    update_last_read = pyqtSignal(str)
-    update_runtime = pyqtSignal(str)
-    update_countdown = pyqtSignal(str)
-    error = pyqtSignal(str)
-    finished = pyqtSignal()
+    """工作线程信号（只用于低频事件，逐次读取的更新走 SchedulerBridge 的合并队列）"""
+    error = pyqtSignal(object, str)
+    stopped = pyqtSignal(object)
+    shut_down = pyqtSignal()
+    sentinel_ready = pyqtSignal(str, object, object)
+    sentinel_failed = pyqtSignal(str, object)
+
+
+class SchedulerBridge(SchedulerListener):
+    """
+    把调度事件转为按目标合并的行快照
+
+    快照在事件所在线程生成，同一目标在两次界面刷新之间只保留最新一行，
+    由界面定时器通过 take() 成批取走；出错和结束另外发出Qt信号。
+    快照在调度器的锁外生成，可能晚于 on_finished 写入，因此已离开调度的目标
+    不再写入快照，以免覆盖删除标记、留下删不掉的行。
+    """
+
+    def __init__(self, signals):
+        self.signals = signals
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _update(self, target):
+        row = target_row(target)
+        with self._lock:
+            # 状态在 on_finished 之前就已改为终止状态，在锁内检查即可
+            if target.state in TERMINAL_STATES:
+                return
+            self._pending[target.id] = row
+
+    def take(self):
+        """取走积累的 {目标ID: 行快照或 None}"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def on_started(self, target):
+        self._update(target)
+
+    def on_read(self, target):
+        profile.mark("首次读取")
+        self._update(target)
+
+    def on_suppressed(self, target):
+        self._update(target)
+
+    def on_state_changed(self, target):
+        self._update(target)
+
+    def on_retry_failed(self, target):
+        # 下一次重试的倒计时已变化
+        self._update(target)
+
+    def on_error(self, target, message):
+        self.signals.error.emit(target, message)
+
+    def on_finished(self, target):
+        with self._lock:
+            self._pending[target.id] = None
+        self.signals.stopped.emit(target)
 
 
 class HDDKeepAliveApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("硬盘保活工具")
-        self.setMinimumSize(480, 600)
-        self.resize(480, 600)
+        self.setMinimumSize(640, 600)
+        self.resize(820, 680)
         
         # 设置窗口图标
         self.set_icon()
         
         # 状态变量
-        self.running = False
-        self.thread = None
+        self.history = None
+        self.history_id = None
+        self.summary = None
+        self.error_box = None
+        self.quitting = False
+        # 正在后台创建哨兵文件的物理设备
+        self.sentinel_devices = set()
+        # 隐藏到托盘后释放窗口的控件树，需要时按当前状态重建
+        self.release_when_hidden = True
+        self.ui_built = False
+        self.form_state = None
         self.signals = WorkerSignals()
+        self.model = TargetTableModel(self)
         
         # 连接信号
-        self.signals.update_count.connect(self.on_update_count)
-        self.signals.update_last_read.connect(self.on_update_last_read)
-        self.signals.update_runtime.connect(self.on_update_runtime)
-        self.signals.update_countdown.connect(self.on_update_countdown)
         self.signals.error.connect(self.on_error)
-        self.signals.finished.connect(self.on_finished)
+        self.signals.stopped.connect(self.on_finished)
+        self.signals.shut_down.connect(QApplication.quit)
+        self.signals.sentinel_ready.connect(self.on_sentinel_ready)
+        self.signals.sentinel_failed.connect(self.on_sentinel_failed)
+        
+        # 所有目标共用一个调度线程；同一 hub / 控制器上的硬盘错峰读取
+        self.bridge = SchedulerBridge(self.signals)
+        self.scheduler = KeepAliveScheduler(self.bridge, policy=StaggerPolicy())
+        self.scheduler.start()
+        
+        # 表格按固定频率成批刷新；运行时间和倒计时由模型自行计算。
+        # 两个定时器都只在有目标且窗口可见时运行
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(TABLE_REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.flush_updates)
+        self.clock_timer = QTimer(self)
+        self.clock_timer.setInterval(1000)
+        self.clock_timer.setTimerType(Qt.CoarseTimer)
+        self.clock_timer.timeout.connect(self.update_clock)
         
         # 初始化UI
         self.init_ui()
         
-        # 加载样式表
-        self.load_stylesheet()
-        
-        # 初始化系统托盘
-        self.init_tray()
+        # 样式表和系统托盘在窗口第一次绘制之后再初始化（finish_startup），
+        # 让窗口尽早出现
+        self.startup_finished = False
 
     def init_ui(self):
-        """初始化用户界面"""
+        """初始化用户界面；释放后重建时也调用"""
+        self.ui_built = True
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
@@ -98,6 +423,12 @@ class HDDKeepAliveApp(QMainWindow):
         file_input_layout.addWidget(self.choose_button)
         
         file_layout.addLayout(file_input_layout)
+        
+        self.sentinel_check = QCheckBox("使用哨兵文件（在所选位置所在的磁盘根目录创建专用文件）")
+        self.sentinel_check.setObjectName("checkBox")
+        self.sentinel_check.setToolTip("不读取个人文件，改为读取本工具创建的16MB专用文件，\n"
+                                       "每次读取不同的块且不更新访问时间，重启后复用")
+        file_layout.addWidget(self.sentinel_check)
         file_group.setLayout(file_layout)
         main_layout.addWidget(file_group)
         
@@ -119,6 +450,12 @@ class HDDKeepAliveApp(QMainWindow):
         self.interval_entry.setObjectName("lineEdit")
         self.interval_entry.setFixedWidth(120)
         interval_layout.addWidget(self.interval_entry)
+        
+        self.adaptive_check = QCheckBox("自适应")
+        self.adaptive_check.setObjectName("checkBox")
+        self.adaptive_check.setToolTip("以上面的间隔为起点，自动探测硬盘的休眠时间，\n"
+                                       "收敛到不让硬盘休眠的最长间隔")
+        interval_layout.addWidget(self.adaptive_check)
         interval_layout.addStretch()
         params_layout.addLayout(interval_layout)
         
@@ -140,6 +477,34 @@ class HDDKeepAliveApp(QMainWindow):
         duration_layout.addStretch()
         params_layout.addLayout(duration_layout)
         
+        # 读取方式
+        engine_layout = QHBoxLayout()
+        engine_label = QLabel("读取方式:")
+        engine_label.setObjectName("label")
+        engine_label.setFixedWidth(130)
+        engine_layout.addWidget(engine_label)
+        
+        self.engine_combo = QComboBox()
+        self.engine_combo.setObjectName("comboBox")
+        self.engine_combo.addItem("自动（绕过缓存）", "auto")
+        self.engine_combo.addItem("直接读取", "direct")
+        self.engine_combo.addItem("丢弃缓存后读取", "fadvise")
+        self.engine_combo.addItem("普通读取", "cached")
+        self.engine_combo.addItem("写入哨兵文件", "write")
+        self.engine_combo.setItemData(
+            4, "改写哨兵文件中的一个块，用于只在写入时才重置休眠计时的硬盘盒；\n"
+               "每块硬盘每天最多写入16MB、每小时最多落盘60次", Qt.ToolTipRole)
+        self.engine_combo.setFixedWidth(160)
+        engine_layout.addWidget(self.engine_combo)
+        
+        self.skip_busy_check = QCheckBox("忙时跳过")
+        self.skip_busy_check.setObjectName("checkBox")
+        self.skip_busy_check.setToolTip("读取前检查硬盘是否已有其它读写（仅Linux），\n"
+                                        "有则跳过本次读取，减少多余的I/O")
+        engine_layout.addWidget(self.skip_busy_check)
+        engine_layout.addStretch()
+        params_layout.addLayout(engine_layout)
+        
         params_group.setLayout(params_layout)
         main_layout.addWidget(params_group)
         
@@ -147,16 +512,17 @@ class HDDKeepAliveApp(QMainWindow):
         button_layout = QHBoxLayout()
         button_layout.setSpacing(12)
         
-        self.start_button = QPushButton("开始运行")
+        self.start_button = QPushButton("添加并开始")
         self.start_button.setObjectName("startButton")
         self.start_button.setFixedSize(200, 40)
         self.start_button.clicked.connect(self.start)
         button_layout.addWidget(self.start_button)
         
-        self.stop_button = QPushButton("停止运行")
+        self.stop_button = QPushButton("停止选中")
         self.stop_button.setObjectName("stopButton")
         self.stop_button.setFixedSize(200, 40)
         self.stop_button.setEnabled(False)
+        self.stop_button.setToolTip("停止表格中选中的目标，未选中时停止全部")
         self.stop_button.clicked.connect(self.stop)
         button_layout.addWidget(self.stop_button)
         
@@ -188,187 +554,62 @@ class HDDKeepAliveApp(QMainWindow):
         line.setFrameShadow(QFrame.Sunken)
         status_layout.addWidget(line)
         
-        # 详细信息
-        self.count_label = QLabel("读取次数: 0")
-        self.count_label.setObjectName("infoLabel")
-        status_layout.addWidget(self.count_label)
-        
-        self.runtime_label = QLabel("运行时间: 00:00:00")
-        self.runtime_label.setObjectName("infoLabel")
-        status_layout.addWidget(self.runtime_label)
+        # 所有目标的状态表
+        self.table = QTableView()
+        self.table.setObjectName("targetTable")
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setAlternatingRowColors(True)
+        self.table.setShowGrid(False)
+        self.table.setWordWrap(False)
+        self.table.setTextElideMode(Qt.ElideMiddle)
+        self.table.setToolTip("延迟跳到秒级表示硬盘刚从休眠中唤醒，\n唤醒次数持续增加说明读取间隔过长")
+        # 固定行高与列宽，避免按内容测量几百行
+        vertical = self.table.verticalHeader()
+        vertical.setVisible(False)
+        vertical.setSectionResizeMode(QHeaderView.Fixed)
+        vertical.setDefaultSectionSize(26)
+        horizontal = self.table.horizontalHeader()
+        horizontal.setSectionResizeMode(QHeaderView.Interactive)
+        horizontal.setSectionResizeMode(COL_PATH, QHeaderView.Stretch)
+        horizontal.setDefaultSectionSize(86)
+        horizontal.setHighlightSections(False)
+        self.table.selectionModel().currentRowChanged.connect(self.on_current_row_changed)
+        status_layout.addWidget(self.table, 1)
         
-        self.countdown_label = QLabel("下次读取: --")
-        self.countdown_label.setObjectName("infoLabel")
-        status_layout.addWidget(self.countdown_label)
-        
-        self.last_read_label = QLabel("最后读取: --")
-        self.last_read_label.setObjectName("infoLabel")
-        status_layout.addWidget(self.last_read_label)
+        self.today_label = QLabel("今日: --")
+        self.today_label.setObjectName("infoLabel")
+        self.today_label.setToolTip("所选目标的今日汇总，来自事件日志，包含之前运行的记录")
+        status_layout.addWidget(self.today_label)
         
         status_group.setLayout(status_layout)
-        main_layout.addWidget(status_group)
-        
-        main_layout.addStretch()
+        main_layout.addWidget(status_group, 1)
 
     def load_stylesheet(self):
         """加载样式表"""
-        qss_path = os.path.join(os.path.dirname(__file__), "styles.qss")
-        if os.path.exists(qss_path):
-            with open(qss_path, 'r', encoding='utf-8') as f:
-                self.setStyleSheet(f.read())
-        else:
-            # 使用内置样式
-            self.setStyleSheet(self.get_default_stylesheet())
+        self.setStyleSheet(read_stylesheet())
 
     def get_default_stylesheet(self):
         """获取默认样式表"""
-        return """
-            QMainWindow {
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                                            stop:0 #f8f9fa, stop:1 #e9ecef);
-            }
-            
-            QWidget {
-                font-family: "Microsoft YaHei UI", "Segoe UI", "微软雅黑", sans-serif;
-            }
-            
-            #title {
-                color: #1a1a2e;
-                padding: 8px;
-                font-weight: 600;
-            }
-            
-            QGroupBox {
-                font-size: 12px;
-                font-weight: 600;
-                color: #2c3e50;
-                border: 1px solid #dfe4ea;
-                border-radius: 8px;
-                margin-top: 0px;
-                padding: 25px 15px 15px 15px;
-                background-color: white;
-            }
-            
-            QGroupBox::title {
-                subcontrol-origin: padding;
-                subcontrol-position: top left;
-                left: 10px;
-                top: 8px;
-                padding: 0;
-                background-color: transparent;
-            }
-            
-            #statusGroup {
-                background-color: white;
-                border: 1px solid #74b9ff;
-                padding: 25px 15px 18px 15px;
-            }
-            
-            #label {
-                color: #2c3e50;
-                font-size: 12px;
-                font-weight: 600;
-                padding: 3px 0;
-            }
-            
-            #hint {
-                color: #636e72;
-                font-size: 10px;
-                font-style: italic;
-            }
-            
-            #infoLabel {
-                color: #2d3436;
-                font-size: 12px;
-                padding: 6px 8px;
-                line-height: 1.5;
-                min-height: 24px;
-            }
-            
-            QLineEdit {
-                border: 1px solid #dfe6e9;
-                border-radius: 5px;
-                padding: 8px 10px;
-                font-size: 12px;
-                background-color: white;
-                color: #2d3436;
-            }
-            
-            QLineEdit:hover {
-                border: 1px solid #b2bec3;
-            }
-            
-            QLineEdit:focus {
-                border: 1px solid #0984e3;
-            }
-            
-            QLineEdit:disabled {
-                background-color: #f1f3f5;
-                color: #868e96;
-                border: 1px solid #dfe6e9;
-            }
-            
-            QPushButton {
-                border: none;
-                border-radius: 5px;
-                padding: 8px 16px;
-                font-size: 12px;
-                font-weight: 600;
-            }
-            
-            #browseButton {
-                background-color: #0984e3;
-                color: white;
-                min-height: 32px;
-            }
-            
-            #browseButton:hover {
-                background-color: #0770c4;
-            }
-            
-            #browseButton:disabled {
-                background-color: #b2bec3;
-                color: #dfe6e9;
-            }
-            
-            #startButton {
-                background-color: #00b894;
-                color: white;
-                font-size: 13px;
-            }
-            
-            #startButton:hover {
-                background-color: #00a383;
-            }
-            
-            #startButton:disabled {
-                background-color: #b2bec3;
-                color: #dfe6e9;
-            }
-            
-            #stopButton {
-                background-color: #d63031;
-                color: white;
-                font-size: 13px;
-            }
-            
-            #stopButton:hover {
-                background-color: #c0282a;
-            }
-            
-            #stopButton:disabled {
-                background-color: #b2bec3;
-                color: #dfe6e9;
-            }
-            
-            #statusText {
-                color: #2c3e50;
-                font-size: 13px;
-                font-weight: 600;
-                min-height: 24px;
-                line-height: 1.5;
-            }
-        """
+        return DEFAULT_STYLESHEET
+
+    def paintEvent(self, event):
+        """第一次绘制之后安排剩余的初始化"""
+        super().paintEvent(event)
+        if not self.startup_finished:
+            profile.mark("首次绘制")
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """加载样式表、创建托盘图标；窗口不显示时（如隐藏启动）由调用方直接调用"""
+        if self.startup_finished:
+            return
+        self.startup_finished = True
+        self.load_stylesheet()
+        profile.mark("样式表")
+        self.init_tray()
+        profile.mark("托盘")
 
     def init_tray(self):
         """初始化系统托盘"""
@@ -407,12 +648,83 @@ class HDDKeepAliveApp(QMainWindow):
             self.show_normal()
 
     def show_normal(self):
-        """显示并激活窗口"""
+        """显示并激活窗口；窗口已被释放时先按当前状态重建"""
+        self.rebuild_window()
         self.show()
         self.activateWindow()
 
+    def hide_to_tray(self):
+        """隐藏窗口，事件循环空闲后释放其控件树"""
+        self.hide()
+        if self.release_when_hidden:
+            QTimer.singleShot(0, self.release_window)
+
+    def release_window(self):
+        """
+        释放隐藏窗口的控件树、样式表和原生窗口，只留下托盘图标、菜单和调度核心
+
+        表单的当前值保存在 form_state 中；表格数据在模型里，调度事件照常合并到桥接队列，
+        重建时一并刷新。窗口对象本身保留，托盘菜单、单实例信号仍连接在它上面。
+        """
+        if not self.ui_built or self.isVisible() or self.quitting:
+            return
+        self.form_state = self.save_form()
+        if self.history is not None:
+            self.history.close()
+        self.history = None
+        if self.error_box is not None:
+            self.error_box.deleteLater()
+            self.error_box = None
+        self.ui_built = False
+        self.summary = None
+        self.takeCentralWidget().deleteLater()
+        self.setStyleSheet("")
+        self.destroy()
+        # 控件在延迟删除事件中才真正释放，之后再归还堆内存
+        QTimer.singleShot(0, trim_heap)
+
+    def rebuild_window(self):
+        """重建已释放的窗口，恢复表单、表格选中行和汇总"""
+        if self.ui_built:
+            return
+        selected = self.history_id
+        self.history_id = None
+        self.init_ui()
+        if self.form_state is not None:
+            self.restore_form(self.form_state)
+        if self.startup_finished:
+            self.load_stylesheet()
+        self.flush_updates()
+        self.summary = None
+        self.update_summary()
+        row = self.model.row_of(selected) if selected is not None else None
+        if row is not None:
+            self.table.selectRow(row)
+
+    def save_form(self):
+        return FormState(
+            self.file_entry.text(), self.interval_entry.text(), self.duration_entry.text(),
+            self.adaptive_check.isChecked(), self.sentinel_check.isChecked(),
+            self.engine_combo.currentIndex(), self.skip_busy_check.isChecked(),
+            self.table.horizontalHeader().saveState())
+
+    def restore_form(self, state):
+        self.file_entry.setText(state.path)
+        self.interval_entry.setText(state.interval)
+        self.duration_entry.setText(state.duration)
+        self.adaptive_check.setChecked(state.adaptive)
+        self.sentinel_check.setChecked(state.sentinel)
+        self.engine_combo.setCurrentIndex(state.engine)
+        self.skip_busy_check.setChecked(state.skip_busy)
+        self.table.horizontalHeader().restoreState(state.header)
+
     def choose_file(self):
         """选择文件"""
+        if self.sentinel_check.isChecked():
+            directory = QFileDialog.getExistingDirectory(self, "选择硬盘或目录")
+            if directory:
+                self.file_entry.setText(directory)
+            return
         file_path, _ = QFileDialog.getOpenFileName(
             self, 
             "选择硬盘文件", 
@@ -423,7 +735,7 @@ class HDDKeepAliveApp(QMainWindow):
             self.file_entry.setText(file_path)
 
     def start(self):
-        """开始运行"""
+        """按当前设置添加一个目标并开始保活"""
         file_path = self.file_entry.text().strip()
         if not file_path or not os.path.exists(file_path):
             QMessageBox.critical(self, "错误", "请选择一个有效的文件路径！")
@@ -438,124 +750,255 @@ class HDDKeepAliveApp(QMainWindow):
             QMessageBox.critical(self, "错误", "请输入有效的数字！\n间隔必须大于0秒。")
             return
 
-        self.running = True
-        self.start_button.setEnabled(False)
-        self.stop_button.setEnabled(True)
-        self.file_entry.setEnabled(False)
-        self.interval_entry.setEnabled(False)
-        self.duration_entry.setEnabled(False)
-        self.choose_button.setEnabled(False)
-        
-        # 更新状态显示
-        self.status_label.setText("运行中")
-        self.status_dot.setStyleSheet("color: #00b894; font-size: 16px;")
-        self.count_label.setText("读取次数: 0")
-        self.runtime_label.setText("运行时间: 00:00:00")
-        self.countdown_label.setText("下次读取: 准备中...")
-        self.last_read_label.setText("最后读取: --")
-        
-        # 更新托盘提示
-        if hasattr(self, 'tray_icon'):
-            self.tray_icon.setToolTip("硬盘保活工具 - 运行中")
+        write_mode = self.engine_combo.currentData() == "write"
+        if write_mode and not self.sentinel_check.isChecked():
+            QMessageBox.critical(self, "错误", "写入模式只能用于哨兵文件，请勾选\"使用哨兵文件\"。")
+            return
 
-        # 启动工作线程
-        self.thread = threading.Thread(
-            target=self.run_task, 
-            args=(file_path, interval, duration)
-        )
-        self.thread.daemon = True
-        self.thread.start()
+        settings = TargetSettings(interval, duration, self.engine_combo.currentData(),
+                                  self.adaptive_check.isChecked(), self.skip_busy_check.isChecked(),
+                                  self.sentinel_check.isChecked())
+        device = device_key(file_path)
+        if settings.sentinel and device is not None and device in self.sentinel_devices:
+            QMessageBox.information(self, "提示", f"正在为 {file_path} 所在的硬盘创建哨兵文件，完成后会自动开始保活。")
+            return
+        # 同一块硬盘上已有目标时会被合并，不再创建用不上的哨兵文件
+        if settings.sentinel and self.scheduler.target_on_device(device) is None:
+            # 创建哨兵文件要写入并落盘 16MB，放到后台线程，完成后再加入调度
+            if device is not None:
+                self.sentinel_devices.add(device)
+            threading.Thread(target=self.create_sentinel, args=(file_path, settings, device),
+                             name="keepalive-sentinel", daemon=True).start()
+            return
+        self.add_target(file_path, settings)
 
-    def run_task(self, file_path, interval, duration):
-        """运行任务（在独立线程中）"""
-        start_time = time.time()
-        count = 0
+    def create_sentinel(self, path, settings, device):
+        """在后台线程中创建（或复用）哨兵文件，结果交回界面线程"""
+        try:
+            self.signals.sentinel_ready.emit(ensure_sentinel(path), settings, device)
+        except OSError as e:
+            self.signals.sentinel_failed.emit(str(e), device)
 
-        while self.running:
-            try:
-                # 读取文件
-                with open(file_path, "rb") as f:
-                    f.read(1)
-                count += 1
-                
-                # 更新读取次数
-                self.signals.update_count.emit(count)
-                
-                # 更新最后读取时间
-                current_time = time.strftime('%H:%M:%S')
-                self.signals.update_last_read.emit(current_time)
-                
-            except Exception as e:
-                self.signals.error.emit(str(e))
-                return
+    def on_sentinel_ready(self, path, settings, device):
+        self.sentinel_devices.discard(device)
+        self.add_target(path, settings)
+
+    def on_sentinel_failed(self, message, device):
+        self.sentinel_devices.discard(device)
+        if not self.quitting:
+            QMessageBox.critical(self, "错误", f"无法创建哨兵文件:\n{message}")
+
+    def add_target(self, file_path, settings):
+        """按 settings 把 file_path 加入调度器"""
+        if self.quitting:
+            return
+        interval = settings.interval
+        try:
+            if settings.engine == "write":
+                engine = WriteEngine(WriteBudget.for_path(file_path))
+            else:
+                engine = create_read_engine(settings.engine)
+        except ValueError as e:
+            QMessageBox.critical(self, "错误", f"当前系统不支持该读取方式:\n{e}")
+            return
+
+        # 加入调度器
+        adaptive = None
+        if settings.adaptive:
+            adaptive = AdaptiveInterval(interval, minimum=min(5, interval), maximum=max(interval, 3600))
+        try:
+            event_log = EventLog.for_target(file_path)
+        except (OSError, ValueError):
+            event_log = None
+        target = KeepAliveTarget(file_path, interval, settings.duration * 60, engine, adaptive,
+                                 skip_busy=settings.skip_busy, event_log=event_log)
+        existing = self.scheduler.same_device(target)
+        if existing is not None:
+            # 同一块硬盘只需一个目标读取
+            discarded = self.scheduler.merge(existing, target)
+            if settings.sentinel and os.path.basename(existing.path) != SENTINEL_NAME:
+                discarded.append(f"使用哨兵文件（沿用 {existing.path}）")
+            row = self.model.row_of(existing.id)
+            if row is not None and self.ui_built:
+                self.table.selectRow(row)
+            message = (f"{file_path}\n与正在保活的 {existing.path}\n位于同一块硬盘，不再重复读取"
+                       f"（读取间隔 {existing.interval:.0f} 秒）。")
+            if discarded:
+                message += "\n\n以下设置未生效：\n" + "\n".join(discarded)
+            QMessageBox.information(self, "提示", message)
+            return
+        self.scheduler.add(target)
+        # 新目标立即显示，并选中以便查看今日汇总；哨兵文件创建期间窗口可能已隐藏并释放
+        self.flush_updates()
+        if self.ui_built:
+            row = self.model.row_of(target.id)
+            if row is not None:
+                self.table.selectRow(row)
+            self.stop_button.setEnabled(True)
+        self.sync_clock_timer()
+
+    def add_path(self, path):
+        """按当前设置开始保活 path"""
+        self.rebuild_window()
+        self.file_entry.setText(path)
+        self.start()
+
+    def attach(self, paths):
+        """再次启动的程序发来的路径：加入调度并把窗口调到前台"""
+        for path in paths:
+            self.add_path(path)
+        self.show_normal()
+        self.raise_()
+
+    @property
+    def running(self):
+        """是否还有目标在调度中"""
+        return bool(self.scheduler.targets())
 
-            # 检查运行时间
-            if duration > 0 and (time.time() - start_time) > duration * 60:
-                break
-
-            # 倒计时间隔
-            for i in range(interval, 0, -1):
-                if not self.running:
-                    break
-                
-                # 更新运行时间
-                elapsed_time = int(time.time() - start_time)
-                hours = elapsed_time // 3600
-                minutes = (elapsed_time % 3600) // 60
-                seconds = elapsed_time % 60
-                self.signals.update_runtime.emit(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
-                
-                # 更新倒计时
-                self.signals.update_countdown.emit(f"{i} 秒")
-                
-                time.sleep(1)
-
-        self.signals.finished.emit()
+    def selected_target_ids(self):
+        rows = self.table.selectionModel().selectedRows()
+        return [self.model.target_id(index.row()) for index in rows]
 
     def stop(self):
-        """停止运行"""
-        self.running = False
-
-    def on_update_count(self, count):
-        """更新读取次数"""
-        self.count_label.setText(f"读取次数: {count}")
-
-    def on_update_last_read(self, time_str):
-        """更新最后读取时间"""
-        self.last_read_label.setText(f"最后读取: {time_str}")
-
-    def on_update_runtime(self, time_str):
-        """更新运行时间"""
-        self.runtime_label.setText(f"运行时间: {time_str}")
-
-    def on_update_countdown(self, countdown_str):
-        """更新倒计时"""
-        self.countdown_label.setText(f"下次读取: {countdown_str}")
-
-    def on_error(self, error_msg):
-        """处理错误"""
-        self.status_label.setText("错误")
-        self.status_dot.setStyleSheet("color: #d63031; font-size: 16px;")
-        QMessageBox.critical(self, "读取错误", f"读取文件时出错:\n{error_msg}")
-        self.on_finished()
-
-    def on_finished(self):
-        """任务完成"""
-        self.running = False
-        self.start_button.setEnabled(True)
-        self.stop_button.setEnabled(False)
-        self.file_entry.setEnabled(True)
-        self.interval_entry.setEnabled(True)
-        self.duration_entry.setEnabled(True)
-        self.choose_button.setEnabled(True)
-        
-        self.status_label.setText("已停止")
-        self.status_dot.setStyleSheet("color: #b2bec3; font-size: 16px;")
-        self.countdown_label.setText("下次读取: --")
-        
-        # 更新托盘提示
+        """停止选中的目标；未选中时停止全部"""
+        target_ids = self.selected_target_ids()
+        if not target_ids:
+            target_ids = [target.id for target in self.scheduler.targets()]
+        for target_id in target_ids:
+            self.scheduler.remove(target_id)
+        self.flush_updates()
+
+    def flush_updates(self):
+        """取走积累的行快照并一次性更新表格"""
+        diffs = self.bridge.take()
+        if not diffs:
+            return
+        self.model.apply(diffs)
+        if self.history_id in diffs:
+            self.update_today_label()
+        self.update_summary()
+
+    def update_summary(self):
+        """汇总状态；只在文字变化时更新，不重复设置样式"""
+        rows = self.model.rows()
+        stalled = sum(1 for row in rows if row.state == "stalled")
+        offline = sum(1 for row in rows if row.state == "offline")
+        if not rows:
+            summary = ("未运行", "#b2bec3")
+        elif stalled or offline:
+            problems = "，".join(text for count, text in ((stalled, f"{stalled} 个无响应"),
+                                                         (offline, f"{offline} 个离线")) if count)
+            summary = (f"运行中 · {len(rows)} 个目标（{problems}）", "#e17055")
+        else:
+            summary = (f"运行中 · {len(rows)} 个目标", "#00b894")
+        if summary == self.summary:
+            return
+        text, color = summary
+        if self.ui_built:
+            if self.summary is None or self.summary[1] != color:
+                self.status_dot.setStyleSheet(f"color: {color}; font-size: 16px;")
+            self.status_label.setText(text)
+            self.stop_button.setEnabled(bool(rows))
+        self.summary = summary
         if hasattr(self, 'tray_icon'):
-            self.tray_icon.setToolTip("硬盘保活工具 - 已停止")
+            self.tray_icon.setToolTip(f"硬盘保活工具 - {text}")
+
+    def on_current_row_changed(self, current, previous):
+        """切换今日汇总所用的事件日志"""
+        target_id = self.model.target_id(current.row()) if current.isValid() else None
+        if target_id == self.history_id:
+            return
+        if self.history is not None:
+            self.history.close()
+        self.history = None
+        self.history_id = target_id
+        row = self.model.snapshot(target_id) if target_id is not None else None
+        if row is not None:
+            try:
+                self.history = EventLog(log_file_for(row.path), readonly=True)
+            except (OSError, ValueError):
+                self.history = None
+        self.update_today_label()
+
+    def update_today_label(self):
+        """根据事件日志汇总所选目标今天的读取情况"""
+        if not self.is_window_shown():
+            return
+        if self.history is None:
+            self.today_label.setText("今日: --")
+            return
+        buckets = rollup(self.history.iter_recent(today_start()), "day")
+        if not buckets:
+            self.today_label.setText("今日: --")
+            return
+        today = buckets[-1][1]
+        self.today_label.setText(
+            f"今日: 读取 {today.issued} · 跳过 {today.suppressed} · "
+            f"唤醒 {today.spinups} · 错误 {today.errors}")
+
+    def is_window_shown(self):
+        """窗口是否可见且未最小化"""
+        return self.isVisible() and not self.isMinimized()
+
+    def sync_clock_timer(self):
+        """仅在有目标且窗口可见时保留界面定时器；停止前把积累的更新刷新一次"""
+        if self.running and self.is_window_shown():
+            if not self.clock_timer.isActive():
+                self.flush_updates()
+                self.update_clock()
+                self.clock_timer.start()
+                self.refresh_timer.start()
+        else:
+            self.clock_timer.stop()
+            self.refresh_timer.stop()
+            if self.is_window_shown():
+                self.flush_updates()
+
+    def showEvent(self, event):
+        """窗口显示时恢复界面刷新"""
+        super().showEvent(event)
+        self.sync_clock_timer()
+        self.update_today_label()
+
+    def hideEvent(self, event):
+        """窗口隐藏（最小化到托盘）时停止界面刷新"""
+        super().hideEvent(event)
+        self.sync_clock_timer()
+
+    def changeEvent(self, event):
+        """最小化/还原时同步界面刷新"""
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.sync_clock_timer()
+
+    def update_clock(self):
+        """刷新所有目标的运行时间和倒计时"""
+        self.model.tick(self.scheduler.clock())
+
+    def on_error(self, target, error_msg):
+        """读取出错：提示框不阻塞事件循环，窗口隐藏在托盘时改用托盘通知"""
+        text = f"读取文件时出错:\n{target.path}\n{error_msg}"
+        if target.recover:
+            text += "\n\n已标记为离线并自动重试，硬盘重新挂载后立即恢复保活。"
+        if not self.isVisible() and hasattr(self, 'tray_icon'):
+            self.tray_icon.showMessage("读取错误", text, QSystemTrayIcon.Warning)
+            return
+        # 多个目标接连出错时复用同一个提示框，只显示最新的错误
+        if self.error_box is None:
+            self.error_box = QMessageBox(QMessageBox.Critical, "读取错误", "", QMessageBox.Ok, self)
+            self.error_box.setWindowModality(Qt.NonModal)
+        self.error_box.setText(text)
+        self.error_box.show()
+        self.error_box.raise_()
+
+    def on_finished(self, target):
+        """目标离开调度"""
+        if target.id == self.history_id and self.history is not None:
+            self.update_today_label()
+        if not self.running:
+            # 最后一个目标离开：隐藏在托盘时也要更新汇总和托盘提示
+            self.flush_updates()
+            self.sync_clock_timer()
 
     def set_icon(self):
         """设置窗口图标"""
@@ -586,31 +1029,66 @@ class HDDKeepAliveApp(QMainWindow):
                 self.quit_application()
             elif reply == QMessageBox.No:
                 event.ignore()
-                self.hide()
+                self.hide_to_tray()
             else:
                 event.ignore()
         else:
             event.accept()
 
     def quit_application(self):
-        """退出应用程序"""
-        if self.running:
-            self.stop()
-            time.sleep(0.5)  # 等待线程结束
-        
+        """
+        退出应用程序
+
+        界面立即隐藏；调度器在后台线程中停止、等待进行中的读取并把事件日志落盘，
+        完成后再结束事件循环。界面线程从不等待，读取卡住时最多 SHUTDOWN_TIMEOUT 秒后照常退出。
+        """
+        if self.quitting:
+            return
+        self.quitting = True
+        self.hide()
         if hasattr(self, 'tray_icon'):
             self.tray_icon.hide()
-        
-        QApplication.quit()
+        threading.Thread(target=self.shutdown_scheduler, name="keepalive-shutdown", daemon=True).start()
+        QTimer.singleShot(int(SHUTDOWN_TIMEOUT * 1000) + 500, QApplication.quit)
+
+    def shutdown_scheduler(self):
+        """在后台线程中停止调度器，结束后通知事件循环退出"""
+        self.scheduler.shutdown(SHUTDOWN_TIMEOUT)
+        self.signals.shut_down.emit()
 
 
 def main():
     app = QApplication(sys.argv)
     app.setApplicationName("硬盘保活工具")
     app.setStyle("Fusion")  # 使用Fusion风格获得更现代的外观
+    profile.mark("QApplication")
+
+    # 已有实例在运行时把目标交给它，不再启动第二个调度器；
+    # 它的工作目录与本进程不同，相对路径要先转为绝对路径
+    paths = [os.path.abspath(path) for path in app.arguments()[1:]]
+    if send_to_running(paths):
+        return
+    # 先占住实例名再创建调度器：两个程序同时启动时，没抢到的一方把路径交给对方后退出
+    instance = InstanceServer(parent=app)
+    if not instance.listen():
+        if not send_to_running(paths):
+            QMessageBox.critical(None, "错误", "程序已在运行，但无法与其通信。")
+        return
     
     window = HDDKeepAliveApp()
+    profile.mark("创建窗口")
     window.show()
+    profile.mark("显示窗口")
+
+    instance.attached.connect(window.attach)
+
+    # 命令行参数中的路径按界面默认设置立即开始保活（可用于开机启动的快捷方式）
+    for path in paths:
+        window.add_path(path)
+    if paths:
+        profile.expect("托盘", "首次读取")
+    else:
+        profile.expect("托盘")
     
     sys.exit(app.exec_())
 
@@ -0,0 +1,226 @@
+"""
+指标导出 - 本地 HTTP 端点，输出 OpenMetrics 格式的计数器和仪表
+
+MetricsListener 作为调度监听器，在调度线程和读取线程中随事件更新该目标自己的计数，
+随后生成一份不可变的快照替换旧快照。HTTP 线程抓取时只读取快照，
+不获取调度器的锁，抓取再慢也不会推迟任何一次读取。
+
+    python daemon.py /mnt/usb1/keep.bin --metrics-port 9469
+    curl http://127.0.0.1:9469/metrics
+"""
+import time
+import threading
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scheduler import SchedulerListener
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# 读取延迟直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+TargetSample = namedtuple("TargetSample", (
+    "path", "interval", "issued", "suppressed", "errors", "spinups", "last_read_time",
+    "lag", "lag_max", "latency_buckets", "latency_count", "latency_sum"))
+
+
+class _TargetCounters:
+    """单个目标的累计值，只由调度线程修改"""
+
+    __slots__ = ("lag_max", "buckets", "latency_sum")
+
+    def __init__(self):
+        self.lag_max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+
+
+class MetricsListener(SchedulerListener):
+    """随调度事件预先聚合指标"""
+
+    def __init__(self, scheduler=None):
+        self.scheduler = scheduler
+        self._counters = {}
+        self._samples = {}
+        # 只保护快照字典的整体替换；同一目标的事件不会并发
+        self._lock = threading.Lock()
+
+    def _counters_for(self, target):
+        # 第一次读取可能早于 add() 所在线程回调 on_started
+        counters = self._counters.get(target.id)
+        if counters is None:
+            counters = self._counters.setdefault(target.id, _TargetCounters())
+        return counters
+
+    def on_started(self, target):
+        self._counters_for(target)
+        self._publish(target)
+
+    def on_read(self, target):
+        counters = self._counters_for(target)
+        seconds = target.latency.last_ns / 1e9
+        counters.latency_sum += seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                counters.buckets[i] += 1
+                break
+        if target.last_lag is not None and target.last_lag > counters.lag_max:
+            counters.lag_max = target.last_lag
+        self._publish(target)
+
+    def on_suppressed(self, target):
+        counters = self._counters_for(target)
+        if target.last_lag is not None and target.last_lag > counters.lag_max:
+            counters.lag_max = target.last_lag
+        self._publish(target)
+
+    def on_state_changed(self, target):
+        self._publish(target)
+
+    def on_error(self, target, message):
+        self._publish(target)
+
+    def on_retry_failed(self, target):
+        self._publish(target)
+
+    def on_finished(self, target):
+        self._counters.pop(target.id, None)
+        # 整体替换字典，抓取线程手里的旧字典保持不变
+        with self._lock:
+            samples = dict(self._samples)
+            samples.pop(target.id, None)
+            self._samples = samples
+
+    def _publish(self, target):
+        counters = self._counters.get(target.id)
+        if counters is None:
+            return
+        cumulative = []
+        total = 0
+        for count in counters.buckets:
+            total += count
+            cumulative.append(total)
+        sample = TargetSample(
+            target.path, target.interval, target.count, target.suppressed, target.errors,
+            target.latency.spinups, target.last_read_time, target.last_lag, counters.lag_max,
+            tuple(cumulative), target.latency.histogram.total, counters.latency_sum)
+        with self._lock:
+            samples = self._samples
+            if target.id in samples:
+                samples[target.id] = sample
+            else:
+                samples = dict(samples)
+                samples[target.id] = sample
+                self._samples = samples
+
+    def render(self):
+        """生成 OpenMetrics 文本"""
+        samples = list(self._samples.values())
+        now = time.time()
+        lines = []
+
+        def family(name, kind, help_text, values, suffix=""):
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"# HELP {name} {help_text}")
+            for sample, value in values:
+                if value is not None:
+                    lines.append(f'{name}{suffix}{{target="{_escape(sample.path)}"}} {_number(value)}')
+
+        family("hdd_keepalive_reads_issued", "counter", "Keepalive reads issued.",
+               [(s, s.issued) for s in samples], "_total")
+        family("hdd_keepalive_reads_suppressed", "counter", "Reads skipped because the device was busy.",
+               [(s, s.suppressed) for s in samples], "_total")
+        family("hdd_keepalive_read_errors", "counter", "Failed keepalive reads.",
+               [(s, s.errors) for s in samples], "_total")
+        family("hdd_keepalive_spinups", "counter", "Reads classified as spin-ups.",
+               [(s, s.spinups) for s in samples], "_total")
+        family("hdd_keepalive_last_read_age_seconds", "gauge", "Seconds since the last completed read.",
+               [(s, None if s.last_read_time is None else max(0.0, now - s.last_read_time))
+                for s in samples])
+        family("hdd_keepalive_interval_seconds", "gauge", "Current read interval.",
+               [(s, s.interval) for s in samples])
+        family("hdd_keepalive_scheduler_lag_seconds", "gauge",
+               "Delay between the deadline and the latest read or skip.",
+               [(s, s.lag) for s in samples])
+        family("hdd_keepalive_scheduler_lag_max_seconds", "gauge", "Largest observed scheduler lag.",
+               [(s, s.lag_max) for s in samples])
+
+        name = "hdd_keepalive_read_latency_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        lines.append(f"# HELP {name} Keepalive read latency.")
+        for s in samples:
+            label = f'target="{_escape(s.path)}"'
+            for bound, count in zip(LATENCY_BUCKETS, s.latency_buckets):
+                lines.append(f'{name}_bucket{{{label},le="{_number(bound)}"}} {count}')
+            lines.append(f'{name}_bucket{{{label},le="+Inf"}} {s.latency_count}')
+            lines.append(f"{name}_count{{{label}}} {s.latency_count}")
+            lines.append(f"{name}_sum{{{label}}} {_number(s.latency_sum)}")
+
+        lines.append("# TYPE hdd_keepalive_targets gauge")
+        lines.append("# HELP hdd_keepalive_targets Targets currently scheduled.")
+        lines.append(f"hdd_keepalive_targets {len(samples)}")
+        if self.scheduler is not None:
+            lines.append("# TYPE hdd_keepalive_scheduler_wakeups counter")
+            lines.append("# HELP hdd_keepalive_scheduler_wakeups Scheduler thread wakeups.")
+            lines.append(f"hdd_keepalive_scheduler_wakeups_total {self.scheduler.wakeups}")
+            lines.append("# TYPE hdd_keepalive_system_resumes counter")
+            lines.append("# HELP hdd_keepalive_system_resumes Detected resumes from system suspend.")
+            lines.append(f"hdd_keepalive_system_resumes_total {self.scheduler.resumes}")
+            lines.append("# TYPE hdd_keepalive_read_stalls counter")
+            lines.append("# HELP hdd_keepalive_read_stalls Reads that exceeded the read timeout.")
+            lines.append(f"hdd_keepalive_read_stalls_total {self.scheduler.stalls}")
+            lines.append("# TYPE hdd_keepalive_offline_transitions counter")
+            lines.append("# HELP hdd_keepalive_offline_transitions Targets that went offline after a read error.")
+            lines.append(f"hdd_keepalive_offline_transitions_total {self.scheduler.offlines}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+class MetricsServer:
+    """在后台线程中提供 /metrics"""
+
+    def __init__(self, listener, port, address="127.0.0.1"):
+        self.listener = listener
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?", 1)[0] != "/metrics":
+                    handler.send_error(404)
+                    return
+                body = listener.render().encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", CONTENT_TYPE)
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((address, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
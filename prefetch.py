@@ -0,0 +1,137 @@
+"""
+预取 - 趁硬盘醒着把接下来可能访问的元数据和热点文件读进内存
+
+保活读取成功（硬盘醒着，或刚被这次读取唤醒），或硬盘正被其它 I/O 占用
+（忙时跳过）时，说明此刻访问硬盘不会额外唤醒它。这时：
+
+- 用 os.scandir 遍历配置的目录并 stat 每一项，把目录项和 inode 载入内核缓存，
+  之后浏览这些目录（ls、文件管理器缩略图列表等）直接由内存应答；
+- 对配置的热点文件调用 posix_fadvise(WILLNEED)，让内核异步预读文件内容，
+  总量不超过字节预算（目录会递归展开为其中的文件）。
+
+预取在单独的后台线程中执行，同一时间最多一次；两次预取之间至少间隔 cooldown 秒，
+避免硬盘持续忙碌时反复遍历。Windows 上没有 posix_fadvise，只做目录遍历。
+"""
+import os
+import time
+import threading
+
+DEFAULT_BUDGET = 64 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_COOLDOWN = 300.0
+
+
+class Prefetcher:
+    """单个目标（一块硬盘）的预取配置与状态"""
+
+    def __init__(self, directories=(), hot_files=(), budget=DEFAULT_BUDGET,
+                 max_entries=DEFAULT_MAX_ENTRIES, cooldown=DEFAULT_COOLDOWN, clock=time.monotonic):
+        if budget < 0 or max_entries < 0:
+            raise ValueError("预取预算不能为负数")
+        self.directories = list(directories)
+        self.hot_files = list(hot_files)
+        self.budget = budget
+        self.max_entries = max_entries
+        self.cooldown = cooldown
+        self.clock = clock
+        self.runs = 0
+        self.entries = 0
+        self.bytes_advised = 0
+        self.last_duration = None
+        self.last_error = None
+        self._last_run = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def trigger(self):
+        """在后台开始一次预取；正在预取或仍在冷却期内时忽略，返回是否已开始"""
+        with self._lock:
+            now = self.clock()
+            if self.running:
+                return False
+            if self._last_run is not None and now - self._last_run < self.cooldown:
+                return False
+            self._last_run = now
+            self._thread = threading.Thread(target=self._run_safely, name="keepalive-prefetch")
+            self._thread.daemon = True
+            self._thread.start()
+            return True
+
+    def _run_safely(self):
+        try:
+            self.run()
+            self.last_error = None
+        except Exception as e:
+            # 预取只是优化，失败不影响保活
+            self.last_error = str(e)
+
+    def run(self):
+        """同步执行一次预取，返回 (遍历的目录项数, 建议预读的字节数)"""
+        begin = time.perf_counter()
+        entries = self._walk_metadata()
+        advised = self._advise_hot_files()
+        self.last_duration = time.perf_counter() - begin
+        self.runs += 1
+        self.entries += entries
+        self.bytes_advised += advised
+        return entries, advised
+
+    def _walk_metadata(self):
+        """遍历目录并 stat 每一项，把目录项和 inode 载入缓存"""
+        count = 0
+        stack = list(self.directories)
+        while stack and count < self.max_entries:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        count += 1
+                        try:
+                            entry.stat(follow_symlinks=False)
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                        except OSError:
+                            pass
+                        if count >= self.max_entries:
+                            break
+            except OSError:
+                continue
+        return count
+
+    def _iter_hot_files(self):
+        for path in self.hot_files:
+            if not os.path.isdir(path):
+                yield path
+                continue
+            for root, _, files in os.walk(path):
+                for name in files:
+                    yield os.path.join(root, name)
+
+    def _advise_hot_files(self):
+        """对热点文件发出 WILLNEED，总量不超过预算"""
+        if not hasattr(os, "posix_fadvise"):
+            return 0
+        remaining = self.budget
+        advised = 0
+        for path in self._iter_hot_files():
+            if remaining <= 0:
+                break
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                length = min(os.fstat(fd).st_size, remaining)
+                if length > 0:
+                    os.posix_fadvise(fd, 0, length, os.POSIX_FADV_WILLNEED)
+                    remaining -= length
+                    advised += length
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+        return advised
@@ -0,0 +1,166 @@
+"""
+离线恢复 - 硬盘掉线或重新挂载后自动恢复保活
+
+读取出错（USB 短暂复位、硬盘盒断电、卸载）时目标不再被移出调度，而是进入
+"offline" 状态，按指数退避重试：1、2、4……秒，最长 MAX_DELAY 秒一次。
+
+退避间隔变长后，硬盘恢复到下一次重试之间可能要等好几分钟，因此另有
+OfflineWatcher 线程专门等待离线目标的路径重新出现：
+
+- Linux 上对 /proc/self/mountinfo 做 poll()，挂载表一变化立即被唤醒；
+- 同时（以及其它平台上）每 POLL_INTERVAL 秒检查一次离线路径是否存在。
+
+路径从不存在变为存在，或挂载表变化后路径存在时，调度器立即重试并重置退避，
+挂载恢复后一秒内恢复读取；路径一直存在（如设备返回 I/O 错误）时只按退避重试。
+检查放在单独的线程中：访问刚掉线的设备可能阻塞，不能拖住调度线程。
+"""
+import os
+import select
+import threading
+
+INITIAL_DELAY = 1.0
+MAX_DELAY = 300.0
+POLL_INTERVAL = 1.0
+
+MOUNTINFO = "/proc/self/mountinfo"
+
+
+class Backoff:
+    """指数退避：每次失败后的重试间隔翻倍，不超过 maximum"""
+
+    def __init__(self, initial=INITIAL_DELAY, maximum=MAX_DELAY, factor=2.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.failures = 0
+
+    def next(self):
+        """记录一次失败，返回到下次重试的秒数"""
+        delay = min(self.maximum, self.initial * self.factor ** self.failures)
+        self.failures += 1
+        return delay
+
+    def reset(self):
+        self.failures = 0
+
+
+class _MountTable:
+    """挂载表变化通知（Linux），不支持时 wait() 退化为普通超时等待"""
+
+    def __init__(self):
+        self._poll = None
+        self._fd = None
+        self._pipe = None
+        if not hasattr(select, "poll"):
+            return
+        try:
+            self._fd = os.open(MOUNTINFO, os.O_RDONLY)
+        except OSError:
+            return
+        # 自管道：stop 时写入一个字节，立即结束 poll
+        self._pipe = os.pipe()
+        self._poll = select.poll()
+        self._poll.register(self._fd, select.POLLPRI | select.POLLERR)
+        self._poll.register(self._pipe[0], select.POLLIN)
+        self._drain()
+
+    def interrupt(self):
+        if self._pipe is not None:
+            try:
+                os.write(self._pipe[1], b"\0")
+            except OSError:
+                pass
+
+    def _drain(self):
+        # 读完整个文件才能清除已报告的变化
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        while os.read(self._fd, 65536):
+            pass
+
+    def wait(self, timeout, stop):
+        """等待挂载表变化、超时或 stop 被设置，返回挂载表是否变化"""
+        if self._poll is None:
+            stop.wait(timeout)
+            return False
+        events = dict(self._poll.poll(timeout * 1000))
+        if stop.is_set() or self._fd not in events:
+            return False
+        self._drain()
+        return True
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._pipe is not None:
+            for fd in self._pipe:
+                os.close(fd)
+            self._pipe = None
+
+
+class OfflineWatcher:
+    """在独立线程中等待离线目标的路径重新出现，出现后通知调度器重试"""
+
+    def __init__(self, scheduler, poll_interval=POLL_INTERVAL):
+        self.scheduler = scheduler
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._mounts = None
+        # 防止 stop() 写入已关闭（文件描述符可能已被复用）的自管道
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="keepalive-offline-watcher")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def notify(self):
+        """有目标进入离线状态"""
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            if self._mounts is not None:
+                self._mounts.interrupt()
+
+    def join(self, timeout=None):
+        """等待线程退出，返回是否已退出"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        return True
+
+    def _run(self):
+        mounts = _MountTable()
+        with self._lock:
+            self._mounts = mounts
+        # 各离线目标上次检查时路径是否存在
+        seen = {}
+        try:
+            while not self._stop.is_set():
+                offline = self.scheduler.offline_targets()
+                if not offline:
+                    # 没有离线目标时不轮询
+                    seen.clear()
+                    self._wake.wait()
+                    self._wake.clear()
+                    continue
+                changed = mounts.wait(self.poll_interval, self._stop)
+                previous, seen = seen, {}
+                for target in offline:
+                    if self._stop.is_set():
+                        break
+                    exists = os.path.exists(target.path)
+                    if exists and (changed or not previous.get(target.id, True)):
+                        self.scheduler.retry(target.id)
+                    seen[target.id] = exists
+        finally:
+            with self._lock:
+                self._mounts = None
+                mounts.close()
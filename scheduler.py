@@ -0,0 +1,873 @@
+"""
+保活调度器 - 单线程管理所有保活目标
+
+所有目标共用一个线程：按各自的单调时钟截止时间放入最小堆，
+线程只在最近的截止时间醒来执行读取，唤醒次数与读取次数成正比，
+与目标数量 × 秒数无关。截止时间按固定步长累加，读取耗时不会累积成漂移，
+修改系统时间也不影响调度。
+
+检测到系统从挂起中恢复（Linux，见 suspend.py）时，所有运行中的目标立即补读一次。
+
+读取默认交给工作线程池执行（见 workers.py），调度线程只负责计时和看门狗：
+读取超过 read_timeout 秒未返回的目标被标记为 "stalled"，不再安排新的读取，
+其所在线程被放弃，其它目标照常调度；卡住的读取一旦返回，目标自动恢复。
+
+传入 policy（StaggerPolicy，见 stagger.py）时，各目标的读取相位被错开，
+同一 USB hub / 控制器上的硬盘同一时间只有有限个读取在进行。
+
+读取出错的目标默认不移出调度，而是进入 "offline" 状态按指数退避重试，
+路径重新出现（硬盘重新挂载）时立即恢复读取，见 recovery.py。
+
+本模块不依赖 PyQt5，事件通过 SchedulerListener 回调通知调用方。
+"""
+import time
+import heapq
+import itertools
+import threading
+
+from diskstats import DiskActivityProbe, device_key
+from eventlog import OUTCOME_ERROR
+from latency import LatencyHistogram, LatencyStats
+from read_engine import ReadEngine, create_read_engine
+from recovery import Backoff, OfflineWatcher
+from suspend import SuspendDetector
+from workers import DEFAULT_WORKERS, ReadJob, ReadWorkerPool
+
+# 忙碌检测窗口占读取间隔的比例：在截止时间前这段时间内设备有过 I/O 即跳过读取
+BUSY_WINDOW = 0.25
+
+# 支持挂起检测时，调度线程最长等待时间：挂起期间单调时钟停止，
+# 等待不会因恢复而提前结束，需要定期醒来检查
+SUSPEND_POLL = 15.0
+
+# 单次读取的默认超时：足够覆盖硬盘从休眠中起转（通常不超过 10~20 秒）
+DEFAULT_READ_TIMEOUT = 30.0
+
+# 退出时等待调度线程、进行中的读取结束的默认时限
+SHUTDOWN_TIMEOUT = 2.0
+
+# 可以安排读取的状态：离线目标的读取即重试
+READABLE_STATES = ("running", "offline")
+# 已离开调度的状态，进入后不会再变化
+TERMINAL_STATES = ("removed", "finished", "error")
+
+
+class KeepAliveTarget:
+    """
+    保活目标
+
+    interval 为读取间隔（秒），duration 为总运行时间（秒，0 为无限），
+    与界面上"总运行时间"的语义一致：到时后完成当次读取即结束。
+    传入 adaptive（AdaptiveInterval）时，interval 由其根据唤醒事件动态调整。
+    skip_busy 为 True 时，若截止时间前的检测窗口内设备已有其它 I/O，
+    则跳过本次读取并顺延截止时间（仅 Linux 块设备支持）。
+    event_log（EventLog）不为 None 时，每次读取、跳过和出错都会写入其中。
+    read_timeout 为单次读取的超时（秒），超时后目标进入 "stalled" 状态。
+    prefetch（Prefetcher）不为 None 时，每次读取成功（硬盘醒着或刚被唤醒）或跳过读取（设备正忙）后
+    在后台预取配置的目录元数据和热点文件，两次预取之间至少间隔其冷却时间。
+    health（HealthProbe）不为 None 时，读取成功后若距上次健康检测已满其间隔，
+    在后台做一次读取基准测试（见 health.py）。
+    group 为错峰调度的分组名，不指定时由调度器的错峰策略按设备拓扑确定。
+    device 为所在物理设备的标识（见 diskstats.device_key），同一设备只需一个目标；
+    并入本目标、不再单独读取的其它路径记录在 aliases 中。
+    recover 为 True 时读取出错后进入 "offline" 状态并按 backoff 退避重试，
+    为 False 时出错即移出调度。
+    """
+
+    def __init__(self, path, interval, duration=0, engine="auto", adaptive=None,
+                 skip_busy=False, event_log=None, read_timeout=DEFAULT_READ_TIMEOUT, prefetch=None,
+                 group=None, recover=True, health=None):
+        if interval <= 0:
+            raise ValueError("间隔必须大于0")
+        self.id = None
+        self.path = path
+        self.interval = adaptive.interval if adaptive is not None else interval
+        self.adaptive = adaptive
+        self.duration = duration
+        self.engine = engine if isinstance(engine, ReadEngine) else create_read_engine(engine)
+        self.busy_probe = DiskActivityProbe.for_path(path) if skip_busy else None
+        self.event_log = event_log
+        self.read_timeout = read_timeout
+        self.prefetch = prefetch
+        self.health = health
+        self.group = group
+        self.device = device_key(path)
+        self.aliases = []
+        self.recover = recover
+        self.backoff = Backoff()
+
+        # 运行状态，由调度线程维护
+        self.state = "pending"
+        self.count = 0
+        self.suppressed = 0
+        self.started_at = None
+        self.next_deadline = None
+        self.last_read_time = None
+        self.error = None
+        # 读取出错的累计次数，包括离线期间重试失败
+        self.errors = 0
+        self.latency = LatencyStats()
+        # 读取实际开始时间相对截止时间的偏差（纳秒），包括排队等线程和等错峰令牌的时间
+        self.jitter = LatencyHistogram()
+        self.last_lag = None
+        self._last_read_at = None
+        self._sampling = False
+        self._job = None
+        self._generation = 0
+        # 错峰调度：所在分组、读取令牌、是否在排队等令牌、最晚读取时间、是否需要重新错相
+        self._group = None
+        self._gate = None
+        self._waiting = False
+        self._latest = None
+        self._place = False
+
+    @property
+    def paused(self):
+        return self.state == "paused"
+
+    @property
+    def stalled(self):
+        return self.state == "stalled"
+
+    @property
+    def offline(self):
+        return self.state == "offline"
+
+    @property
+    def reading(self):
+        """是否有读取正在进行（此时不能释放读取引擎）"""
+        return self._job is not None
+
+    def close(self):
+        """释放读取引擎和事件日志"""
+        self.engine.close()
+        if self.event_log is not None:
+            self.event_log.close()
+
+    @property
+    def active(self):
+        return self.state in ("running", "paused", "stalled", "offline")
+
+
+class SchedulerListener:
+    """调度事件回调，默认全部为空操作；回调可能在调度线程中执行"""
+
+    def on_started(self, target):
+        """目标加入调度"""
+
+    def on_read(self, target):
+        """
+        完成一次读取
+
+        target.next_deadline 已更新为下一次读取时间，
+        target.latency 中记录了本次延迟及是否为唤醒事件。
+        """
+
+    def on_suppressed(self, target):
+        """设备正忙，本次读取被跳过，target.next_deadline 已顺延"""
+
+    def on_state_changed(self, target):
+        """目标被暂停、恢复，读取超时停滞，出错离线，或停滞、离线后恢复"""
+
+    def on_error(self, target, message):
+        """
+        读取出错
+
+        可恢复的目标（recover）进入 "offline" 状态，随后还会收到 on_state_changed；
+        离线期间的重试再出错不重复通知，改为 on_retry_failed。不可恢复的目标随后被移出调度。
+        target.errors 为累计的出错次数（包括离线期间重试失败）。
+        """
+
+    def on_retry_failed(self, target):
+        """离线期间的重试再次出错，target.errors 已累加，target.next_deadline 为下一次重试时间"""
+
+    def on_finished(self, target):
+        """目标离开调度（到时、被移除或出错）"""
+
+    def on_resumed(self, suspended):
+        """系统从挂起中恢复（挂起约 suspended 秒），运行中的目标已安排立即补读"""
+
+    def on_stopped(self):
+        """调度线程退出"""
+
+
+class ListenerGroup(SchedulerListener):
+    """把调度事件依次分发给多个监听器"""
+
+    def __init__(self, *listeners):
+        self.listeners = list(listeners)
+
+    def on_started(self, target):
+        for listener in self.listeners:
+            listener.on_started(target)
+
+    def on_read(self, target):
+        for listener in self.listeners:
+            listener.on_read(target)
+
+    def on_suppressed(self, target):
+        for listener in self.listeners:
+            listener.on_suppressed(target)
+
+    def on_state_changed(self, target):
+        for listener in self.listeners:
+            listener.on_state_changed(target)
+
+    def on_error(self, target, message):
+        for listener in self.listeners:
+            listener.on_error(target, message)
+
+    def on_retry_failed(self, target):
+        for listener in self.listeners:
+            listener.on_retry_failed(target)
+
+    def on_finished(self, target):
+        for listener in self.listeners:
+            listener.on_finished(target)
+
+    def on_resumed(self, suspended):
+        for listener in self.listeners:
+            listener.on_resumed(suspended)
+
+    def on_stopped(self):
+        for listener in self.listeners:
+            listener.on_stopped()
+
+
+class KeepAliveScheduler:
+    """
+    基于最小堆的单线程截止时间调度器
+
+    workers 为读取线程数；为 0 时在调度线程内同步读取，
+    run_pending() 返回时读取均已完成（测试、基准用），但没有超时保护，也不限制并发。
+    policy 为错峰策略（StaggerPolicy），None 时各目标严格按固定步长读取。
+    timer 为测量读取延迟的纳秒计时器，模拟器（simulator.py）注入虚拟时间。
+    """
+
+    def __init__(self, listener=None, clock=time.monotonic, detect_suspend=True,
+                 workers=DEFAULT_WORKERS, policy=None, timer=time.perf_counter_ns):
+        self.listener = listener or SchedulerListener()
+        self.clock = clock
+        self.timer = timer
+        self.policy = policy
+        self.wakeups = 0
+        self.resumes = 0
+        self.stalls = 0
+        self.offlines = 0
+        self._watcher = None
+        self._pool = ReadWorkerPool(self._work, workers, clock) if workers else None
+        # 外部注入的时钟（测试、基准）与系统挂起无关
+        self.suspend_detector = None
+        if detect_suspend and clock is time.monotonic:
+            detector = SuspendDetector()
+            if detector.supported:
+                self.suspend_detector = detector
+
+        self._targets = {}
+        self._heap = []
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._changed = False
+        self._running = False
+        self._thread = None
+
+    # ---------- 目标管理 ----------
+
+    def add(self, target):
+        """加入目标并立即安排第一次读取，返回目标 ID"""
+        # 解析设备拓扑需要访问 sysfs，不在锁内进行
+        group = self.policy.group(target) if self.policy is not None else None
+        with self._cond:
+            target.id = next(self._ids)
+            now = self.clock()
+            target.state = "running"
+            target.started_at = now
+            target._group = group
+            if group is not None and self._pool is not None:
+                target._gate = self.policy.gate(group)
+            target._place = True
+            self._targets[target.id] = target
+            self._push(target, now, now)
+        self.listener.on_started(target)
+        return target.id
+
+    def remove(self, target_id):
+        """移除目标；正在读取的目标会在读取结束后释放"""
+        with self._cond:
+            target = self._targets.pop(target_id, None)
+            if target is None:
+                return False
+            target.state = "removed"
+            target._generation += 1
+            self._wake()
+            reading = target.reading
+        if not reading:
+            target.close()
+        self.listener.on_finished(target)
+        return True
+
+    def pause(self, target_id):
+        """暂停目标，不再安排读取"""
+        with self._cond:
+            target = self._targets.get(target_id)
+            if target is None or target.state not in READABLE_STATES:
+                return False
+            target.state = "paused"
+            target.next_deadline = None
+            target._generation += 1
+            self._wake()
+        self.listener.on_state_changed(target)
+        return True
+
+    def resume(self, target_id):
+        """恢复目标；暂停期间硬盘可能已休眠，因此立即读取一次"""
+        with self._cond:
+            target = self._targets.get(target_id)
+            if target is None or target.state != "paused":
+                return False
+            target.state = "running"
+            # 暂停期间的间隔不代表调度间隔，不计入自适应探测
+            target._last_read_at = None
+            target._place = True
+            now = self.clock()
+            self._push(target, now, now)
+        self.listener.on_state_changed(target)
+        return True
+
+    def retry(self, target_id):
+        """离线目标立即重试一次并重置退避，返回是否已安排"""
+        with self._cond:
+            target = self._targets.get(target_id)
+            if target is None or target.state != "offline" or target._job is not None:
+                return False
+            target.backoff.reset()
+            now = self.clock()
+            self._push(target, now, now)
+        return True
+
+    def offline_targets(self):
+        """当前处于离线状态的目标"""
+        with self._cond:
+            return [target for target in self._targets.values() if target.state == "offline"]
+
+    def same_device(self, target):
+        """与 target 位于同一物理设备、仍在调度中的目标，没有时返回 None"""
+        return self.target_on_device(target.device, exclude=target)
+
+    def target_on_device(self, device, exclude=None):
+        """位于物理设备 device（见 diskstats.device_key）、仍在调度中的目标，没有时返回 None"""
+        if device is None:
+            return None
+        with self._cond:
+            for other in self._targets.values():
+                if other is not exclude and other.device == device and other.active:
+                    return other
+        return None
+
+    def merge(self, existing, target):
+        """
+        把 target 并入同一设备上的 existing，不单独调度读取
+
+        读取间隔取两者中较短的（existing 为自适应间隔时不变），
+        新间隔不晚于原截止时间生效；运行时间取结束得较晚的（0 为无限）。
+        读取方式、写入保活和忙时跳过沿用 existing 的设置，返回被舍弃的 target 设置的说明
+        （没有时为空列表）；target 随即被释放。
+        """
+        discarded = []
+        modes = {True: "写入", False: "读取"}
+        switches = {True: "开", False: "关"}
+        existing_write = existing.engine.name == "write"
+        if (target.engine.name == "write") != existing_write:
+            discarded.append(f"保活方式 {modes[not existing_write]}（沿用 {modes[existing_write]}）")
+        elif target.engine.name != existing.engine.name:
+            discarded.append(f"读取方式 {target.engine.name}（沿用 {existing.engine.name}）")
+        existing_busy = existing.busy_probe is not None
+        if (target.busy_probe is not None) != existing_busy:
+            discarded.append(f"忙时跳过 {switches[not existing_busy]}（沿用 {switches[existing_busy]}）")
+        with self._cond:
+            existing.aliases.append(target.path)
+            if existing.duration > 0:
+                if target.duration <= 0:
+                    existing.duration = 0
+                else:
+                    # 新目标的运行时间从现在算起
+                    existing.duration = max(existing.duration,
+                                            self.clock() - existing.started_at + target.duration)
+            if existing.adaptive is None and target.interval < existing.interval:
+                existing.interval = target.interval
+                if (existing.state == "running" and existing._job is None and not existing._waiting
+                        and existing._last_read_at is not None):
+                    deadline = existing._last_read_at + existing.interval
+                    if deadline < existing.next_deadline:
+                        self._push(existing, max(deadline, self.clock()), self.clock())
+        target.close()
+        return discarded
+
+    def get(self, target_id):
+        with self._cond:
+            return self._targets.get(target_id)
+
+    def targets(self):
+        """当前所有目标的列表"""
+        with self._cond:
+            return list(self._targets.values())
+
+    # ---------- 线程控制 ----------
+
+    def start(self):
+        """启动调度线程"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="keepalive-scheduler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """通知调度线程退出（不等待）"""
+        with self._cond:
+            self._running = False
+            self._wake()
+            watcher = self._watcher
+        if watcher is not None:
+            watcher.stop()
+
+    def join(self, timeout=None):
+        """等待调度线程退出，返回是否已退出"""
+        if self._thread is None:
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """
+        停止调度并释放目标，总共最多等待 timeout 秒；返回是否干净退出
+
+        调度线程退出后等待进行中的读取返回，再关闭所有目标（事件日志随之落盘），
+        并对每个目标回调 on_finished，监听器据此输出各目标的统计。
+        到时仍卡在读取中的目标由其读取线程持有，不关闭，留给进程退出回收。
+        """
+        deadline = time.monotonic() + timeout
+        self.stop()
+        if not self.join(timeout):
+            return False
+        clean = True
+        if self._pool is not None:
+            clean = self._pool.join(max(0.0, deadline - time.monotonic()))
+        watcher = self._watcher
+        if watcher is not None:
+            # stop() 之后由读取线程启动的监视线程没有收到停止通知
+            watcher.stop()
+            clean = watcher.join(max(0.0, deadline - time.monotonic())) and clean
+        with self._cond:
+            targets = list(self._targets.values())
+            self._targets.clear()
+            for target in targets:
+                target.state = "removed"
+                target._generation += 1
+            idle = [target for target in targets if not target.reading]
+        for target in idle:
+            target.close()
+        for target in targets:
+            self.listener.on_finished(target)
+        return clean and len(idle) == len(targets)
+
+    @property
+    def running(self):
+        return self._running
+
+    # ---------- 调度核心 ----------
+
+    def next_deadline(self):
+        """最近的有效截止时间，无任务时为 None"""
+        with self._cond:
+            return self._peek()
+
+    def run_pending(self, now=None):
+        """
+        执行所有已到期的读取，返回下一个截止时间（无任务时为 None）
+
+        调度线程每次醒来调用一次；传入 now 时可由外部时钟驱动（测试、基准）。
+        """
+        while True:
+            with self._cond:
+                current = self.clock() if now is None else now
+                deadline = self._peek()
+                if deadline is None or deadline > current:
+                    return deadline
+                _, _, target_id, _ = heapq.heappop(self._heap)
+                target = self._targets[target_id]
+                stalled = False
+                if target._job is not None:
+                    # 读取尚未返回，这是看门狗检查
+                    stalled = self._watchdog(target, current)
+                    if not stalled:
+                        continue
+                elif target._waiting:
+                    # 排队等令牌已到最晚读取时间
+                    self._start_read(target, current)
+                    continue
+                if not stalled and target.busy_probe is None and self._pool is not None:
+                    # 无需忙碌检测的读取直接在锁内交给线程池
+                    self._start_read(target, current)
+                    continue
+            if stalled:
+                self.listener.on_state_changed(target)
+            else:
+                self._tick(target, current)
+
+    def _run(self):
+        detector = self.suspend_detector
+        while True:
+            if detector is not None:
+                suspended = detector.check()
+                if suspended:
+                    self._catch_up(suspended)
+            next_deadline = self.run_pending()
+            with self._cond:
+                if not self._running:
+                    break
+                if self._changed:
+                    self._changed = False
+                    continue
+                if next_deadline is None:
+                    timeout = None
+                else:
+                    timeout = next_deadline - self.clock()
+                if detector is not None and (timeout is None or timeout > SUSPEND_POLL):
+                    timeout = SUSPEND_POLL
+                if timeout is None or timeout > 0:
+                    self._cond.wait(timeout)
+                self.wakeups += 1
+        if self._pool is not None:
+            self._pool.close()
+        self.listener.on_stopped()
+
+    def _catch_up(self, suspended):
+        """系统挂起后恢复：运行中的目标立即补读，相位从此刻重新起算"""
+        with self._cond:
+            self.resumes += 1
+            now = self.clock()
+            for target in self._targets.values():
+                if target.state != "running":
+                    continue
+                # 挂起前后的间隔不代表调度间隔，也不能沿用挂起前的忙碌基准
+                target._last_read_at = None
+                if target.busy_probe is not None:
+                    target.busy_probe.reset()
+                target._place = True
+                self._push(target, now, now)
+        self.listener.on_resumed(suspended)
+
+    def _tick(self, target, now):
+        """处理目标的一次到期：忙碌检测采样、跳过或读取"""
+        if target._sampling:
+            # 检测窗口开始：记录扇区计数，截止时间再决定是否读取
+            target.busy_probe.mark()
+            with self._cond:
+                if target.state == "running":
+                    target._sampling = False
+                    self._enqueue(target, target.next_deadline)
+            return
+        if target.busy_probe is not None and target.state == "running" and target.busy_probe.busy():
+            self._suppress(target, now)
+        elif self._pool is not None:
+            with self._cond:
+                if target.state in READABLE_STATES and target._job is None:
+                    self._start_read(target, now)
+        else:
+            if target.state == "running":
+                with self._cond:
+                    self._record_lag(target, self.clock() - target.next_deadline)
+            latency_ns, error = self._perform(target)
+            self._complete(target, now, now, latency_ns, error)
+
+    def _record_lag(self, target, lag):
+        """记录读取实际开始时间相对截止时间的滞后（调用方持有锁）"""
+        target.last_lag = lag
+        target.jitter.record(int(lag * 1e9))
+
+    def _start_read(self, target, now):
+        """
+        取得分组令牌后派发读取（调用方持有锁）
+
+        没有空闲令牌时排队，由同组的读取结束时接手；最晚等到 _latest，
+        届时不论有无令牌都开始读取，保证两次读取的间隔不超过 interval。
+        """
+        gate = target._gate
+        if gate is not None and not gate.acquire():
+            if target._latest is None:
+                # 加入、恢复或挂起后的第一次读取没有上次读取可参照，最多等一个读取超时
+                target._latest = now + target.read_timeout
+            if now < target._latest:
+                if not target._waiting:
+                    target._waiting = True
+                    gate.deferred += 1
+                    gate.waiting.append(target)
+                self._enqueue(target, target._latest)
+                return
+            gate.force()
+        target._waiting = False
+        self._dispatch(target, now, gate)
+
+    def _release(self, job, now):
+        """归还读取令牌，并交给同组排队最久的目标（调用方持有锁）"""
+        gate, job.gate = job.gate, None
+        if gate is None:
+            return
+        gate.release()
+        # 停止后不再派发新的读取
+        while gate.waiting and self._running:
+            waiter = gate.waiting.popleft()
+            if waiter._waiting and waiter.state in READABLE_STATES and waiter._job is None:
+                self._start_read(waiter, now)
+                return
+
+    def _dispatch(self, target, now, gate=None):
+        """把读取交给线程池，并在超时时刻安排看门狗检查（调用方持有锁）"""
+        # 离线重试不是按周期安排的读取，不计入调度偏差
+        job = ReadJob(target, now, target.next_deadline if target.state == "running" else None)
+        job.gate = gate
+        target._job = job
+        self._enqueue(target, now + target.read_timeout)
+        self._pool.submit(job)
+
+    def _watchdog(self, target, now):
+        """
+        读取超时检查，返回目标是否刚进入停滞状态（调用方持有锁）
+
+        超时的读取所在线程被放弃，目标在读取返回前不再安排新的读取。
+        """
+        job = target._job
+        if job.started is None:
+            # 线程池全忙，读取还在排队，从开始执行时再计时
+            self._enqueue(target, now + target.read_timeout)
+            return False
+        expires = job.started + target.read_timeout
+        if now < expires:
+            self._enqueue(target, expires)
+            return False
+        if target.state not in READABLE_STATES:
+            return False
+        target.state = "stalled"
+        target.next_deadline = None
+        self.stalls += 1
+        self._pool.recycle(job)
+        # 停滞的读取不再占用令牌，同组其它硬盘照常读取
+        self._release(job, now)
+        return True
+
+    def _work(self, job):
+        """工作线程中执行读取"""
+        target = job.target
+        if job.deadline is not None:
+            with self._cond:
+                self._record_lag(target, job.started - job.deadline)
+        latency_ns, error = self._perform(target)
+        self._complete(target, job.submitted, self.clock(), latency_ns, error)
+
+    def _suppress(self, target, now):
+        """窗口内设备已有 I/O，跳过读取"""
+        with self._cond:
+            if target.state != "running":
+                return
+            target.suppressed += 1
+            if target.event_log is not None:
+                target.event_log.append(time.time(), suppressed=True)
+            # 硬盘由其它 I/O 保持活跃，下一次的间隔不代表调度间隔
+            target._last_read_at = None
+            # 设备至少在窗口起点之后活跃过，从窗口起点起算一个完整间隔
+            window_start = target.next_deadline - target.interval * BUSY_WINDOW
+            finished = self._advance(target, now, window_start + target.interval)
+        self.listener.on_suppressed(target)
+        if target.prefetch is not None:
+            # 硬盘正被其它 I/O 占用，此时预取不会额外唤醒它
+            target.prefetch.trigger()
+        if finished:
+            target.close()
+            self.listener.on_finished(target)
+
+    def _perform(self, target):
+        """执行一次读取，返回 (延迟纳秒, 异常)"""
+        try:
+            begin = self.timer()
+            target.engine.read(target.path)
+            return self.timer() - begin, None
+        except Exception as e:
+            return None, e
+
+    def _complete(self, target, started, now, latency_ns, error):
+        """
+        记录读取结果并安排下一次
+
+        started 为读取的计划（派发）时间，用于自适应间隔；now 为完成时间。
+        """
+        if error is not None:
+            if target.recover:
+                self._go_offline(target, now, error)
+                return
+            with self._cond:
+                self._finish_job(target, now)
+                removed = self._targets.pop(target.id, None) is None
+                target.errors += 1
+                target.state = "error"
+                target.error = str(error)
+                target._generation += 1
+                if target.event_log is not None:
+                    target.event_log.append(time.time(), outcome=OUTCOME_ERROR)
+            target.close()
+            if not removed:
+                self.listener.on_error(target, str(error))
+                self.listener.on_finished(target)
+            return
+
+        with self._cond:
+            self._finish_job(target, now)
+            if target.state == "removed":
+                target.close()
+                return
+            recovered = target.state in ("stalled", "offline")
+            if recovered:
+                target.state = "running"
+                target.error = None
+                target.backoff.reset()
+            target.count += 1
+            target.last_read_time = time.time()
+            spinup = target.latency.record(latency_ns)
+            if target.event_log is not None:
+                target.event_log.append(target.last_read_time, latency_ns, spinup=spinup)
+            if target.adaptive is not None and target._last_read_at is not None and not recovered:
+                target.interval = target.adaptive.observe(started - target._last_read_at, spinup)
+            target._last_read_at = None if recovered else started
+            if self.policy is not None:
+                finished = self._advance(target, now, *self._stagger(target, started, now, recovered))
+            elif recovered:
+                # 停滞期间错过的周期不补读，从现在起重新计相位
+                finished = self._advance(target, now, now + target.interval)
+            else:
+                # 读取期间被暂停时没有截止时间，恢复时会重新安排
+                base = target.next_deadline if target.next_deadline is not None else now
+                finished = self._advance(target, now, base + target.interval)
+
+        if recovered:
+            self.listener.on_state_changed(target)
+        self.listener.on_read(target)
+        if target.prefetch is not None:
+            # 读取成功说明硬盘此刻醒着（或刚被唤醒），趁机预取；冷却时间限制预取的频率
+            target.prefetch.trigger()
+        if target.health is not None and not (target.prefetch is not None and target.prefetch.running):
+            # 硬盘刚完成读取，此时测试不会额外唤醒它；与预取同时进行会拉低测得的吞吐量
+            target.health.trigger()
+        if finished:
+            target.close()
+            self.listener.on_finished(target)
+
+    def _go_offline(self, target, now, error):
+        """读取出错：目标进入离线状态，按退避时间安排重试"""
+        with self._cond:
+            self._finish_job(target, now)
+            if target.state == "removed":
+                target.close()
+                return
+            target.errors += 1
+            notify = target.state != "offline"
+            if notify:
+                self.offlines += 1
+            target.state = "offline"
+            target.error = str(error)
+            # 离线前后的间隔不代表调度间隔
+            target._last_read_at = None
+            if target.event_log is not None:
+                target.event_log.append(time.time(), outcome=OUTCOME_ERROR)
+            finished = self._advance(target, now, now + target.backoff.next())
+            # 停止后（shutdown 正在等待进行中的读取）不再启动监视线程
+            if not finished and self._watcher is None and self._running:
+                self._watcher = OfflineWatcher(self)
+                self._watcher.start()
+            watcher = self._watcher
+        if finished:
+            target.close()
+            if notify:
+                self.listener.on_error(target, str(error))
+            self.listener.on_finished(target)
+            return
+        if watcher is not None:
+            watcher.notify()
+        if notify:
+            self.listener.on_error(target, str(error))
+            self.listener.on_state_changed(target)
+        else:
+            self.listener.on_retry_failed(target)
+
+    def _finish_job(self, target, now):
+        """读取返回：清除进行中的读取并归还令牌（调用方持有锁）"""
+        job, target._job = target._job, None
+        if job is not None:
+            self._release(job, now)
+
+    def _stagger(self, target, started, now, recovered):
+        """按错峰策略计算下一次读取的 (截止时间, 最晚读取时间)（调用方持有锁）"""
+        interval = target.interval
+        latest = (now if recovered else started) + interval
+        if target._place or recovered:
+            target._place = False
+            deadlines = [other.next_deadline for other in self._targets.values()
+                         if other is not target and other._group == target._group
+                         and other.state == "running" and other.next_deadline is not None]
+            return min(self.policy.place(now, interval, deadlines), latest), latest
+        return latest - self.policy.offset(interval), latest
+
+    def _advance(self, target, now, deadline, latest=None):
+        """
+        到时则结束目标，否则安排下一次截止时间；返回是否结束（调用方持有锁）
+
+        latest 为错峰调度下排队等令牌的最晚读取时间。
+        """
+        if target.duration > 0 and now - target.started_at >= target.duration:
+            self._targets.pop(target.id, None)
+            target.state = "finished"
+            target.next_deadline = None
+            return True
+        if target.state in READABLE_STATES:
+            # 截止时间按固定步长累加，读取耗时不会累积成漂移；
+            # 落后超过一个周期时跳过错过的周期，不做补读
+            if deadline <= now:
+                missed = (now - deadline) // target.interval + 1
+                deadline += missed * target.interval
+                if latest is not None:
+                    latest = max(latest, deadline)
+            self._push(target, deadline, now, latest)
+        return False
+
+    def _push(self, target, deadline, now, latest=None):
+        """安排目标在 deadline 读取，需要时先安排忙碌检测采样（调用方持有锁）"""
+        target.next_deadline = deadline
+        target._latest = latest
+        target._waiting = False
+        window = target.interval * BUSY_WINDOW
+        target._sampling = (target.busy_probe is not None and target.state == "running"
+                            and deadline - window > now)
+        self._enqueue(target, deadline - window if target._sampling else deadline)
+
+    def _enqueue(self, target, when):
+        """放入堆中，使该目标之前的条目失效（调用方持有锁）"""
+        target._generation += 1
+        heapq.heappush(self._heap, (when, next(self._seq), target.id, target._generation))
+        self._wake()
+
+    def _peek(self):
+        """清理失效的堆顶条目并返回最近截止时间（调用方持有锁）"""
+        while self._heap:
+            deadline, _, target_id, generation = self._heap[0]
+            target = self._targets.get(target_id)
+            if target is not None and target._generation == generation:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def _wake(self):
+        """通知调度线程重新计算等待时间（调用方持有锁）"""
+        self._changed = True
+        self._cond.notify()
@@ -0,0 +1,368 @@
+"""
+保活策略模拟器 - 用录制的磁盘活动离线比较不同的保活策略
+
+在真实硬盘上调 interval 要等上好几天。模拟器把录制的前台 I/O 回放到一个
+硬盘模型上（可配置休眠超时和起转代价），用真实的调度器代码（虚拟时钟、同步读取）
+分别运行各保活策略，几秒钟内跑完数天的记录，报告每种策略的保活读取次数、
+起转次数（其中多少次由前台 I/O 承担，即用户要等硬盘起转）以及能耗估算。
+
+支持两种记录格式，每行一条，# 开头的行忽略：
+
+- diskstats 采样：时间戳后接一行 /proc/diskstats，例如用
+      while true; do echo "$(date +%s) $(grep ' sdb ' /proc/diskstats)"; sleep 5; done > trace.txt
+  录制；相邻两次采样之间读写次数有变化，视为该时刻有一次前台 I/O。
+  文件中有多个设备时用 --device 指定。
+- 读取延迟记录：每行 "时间戳 [延迟毫秒]"，每行是一次前台 I/O。带延迟时，
+  超过唤醒阈值的延迟的中位数可作为起转耗时（未指定 --spinup-seconds 时）。
+
+策略写作 名称:间隔[:最大间隔]，可重复指定：
+
+    fixed:60             固定 60 秒读取一次
+    adaptive:60:3600     从 60 秒开始自适应探测休眠超时，最长 3600 秒
+    busy:60              固定 60 秒，设备已有 I/O 时跳过（忙时跳过）
+    adaptive+busy:60     自适应 + 忙时跳过
+    none                 不保活，作为对照
+
+    python simulator.py trace.txt --standby-timeout 600 --policy fixed:60 --policy adaptive:60
+"""
+import sys
+import json
+import time
+import argparse
+
+from adaptive import AdaptiveInterval
+from latency import SPINUP_THRESHOLD_NS
+from read_engine import ReadEngine
+from scheduler import KeepAliveScheduler, KeepAliveTarget
+
+DEFAULT_POLICIES = ("none", "fixed:60", "busy:60", "adaptive:60", "adaptive+busy:60")
+
+# 3.5 寸机械硬盘的典型值
+DEFAULT_STANDBY_TIMEOUT = 600.0
+DEFAULT_SPINUP_SECONDS = 8.0
+DEFAULT_SPINUP_JOULES = 100.0
+DEFAULT_IDLE_WATTS = 5.0
+DEFAULT_STANDBY_WATTS = 0.8
+DEFAULT_READ_SECONDS = 0.005
+
+DEFAULT_MAX_INTERVAL = 3600
+
+SIMULATED_PATH = "<模拟硬盘>"
+
+
+class TraceError(ValueError):
+    """记录文件无效"""
+
+
+def _parse_diskstats(rows, device):
+    """diskstats 采样 -> 前台 I/O 时刻"""
+    devices = {row[3] for row in rows}
+    if device is None:
+        if len(devices) > 1:
+            raise TraceError(f"记录中有多个设备 {sorted(devices)}，请用 --device 指定")
+        device = devices.pop()
+    events = []
+    previous = None
+    for row in rows:
+        if row[3] != device:
+            continue
+        # 第 1、5 个统计字段为完成的读、写次数
+        operations = int(row[4]) + int(row[8])
+        if previous is not None and operations != previous:
+            events.append(float(row[0]))
+        previous = operations
+    return events, []
+
+
+def load_trace(path, device=None):
+    """读取记录文件，返回 (前台 I/O 时刻列表, 延迟毫秒列表)"""
+    rows = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                rows.append((number, line.split()))
+    except OSError as e:
+        raise TraceError(f"无法读取记录文件 {path}: {e}")
+    if not rows:
+        raise TraceError(f"记录文件 {path} 为空")
+    if len(rows[0][1]) >= 12:
+        try:
+            return _parse_diskstats([fields for _, fields in rows], device)
+        except TraceError:
+            raise
+        except (ValueError, IndexError):
+            raise TraceError(f"{path}: 无法解析的 diskstats 采样")
+    events, latencies = [], []
+    for number, fields in rows:
+        try:
+            events.append(float(fields[0]))
+            if len(fields) > 1:
+                latencies.append(float(fields[1]))
+        except ValueError:
+            raise TraceError(f"{path}: 第 {number} 行无法解析")
+    return sorted(events), latencies
+
+
+def estimate_spinup(latencies_ms):
+    """延迟记录中判定为唤醒的延迟的中位数（秒），没有时返回 None"""
+    threshold = SPINUP_THRESHOLD_NS / 1e6
+    spinups = sorted(latency for latency in latencies_ms if latency >= threshold)
+    if not spinups:
+        return None
+    return spinups[len(spinups) // 2] / 1000
+
+
+class SimulatedClock:
+    """虚拟时钟：调度器的单调时钟（秒）与读取延迟计时器（纳秒）"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.ns = 0
+
+    def __call__(self):
+        return self.now
+
+    def timer(self):
+        return self.ns
+
+
+class DriveModel:
+    """休眠超时内没有访问即停转；停转后的访问需等待起转"""
+
+    def __init__(self, standby_timeout=DEFAULT_STANDBY_TIMEOUT, spinup_seconds=DEFAULT_SPINUP_SECONDS,
+                 spinup_joules=DEFAULT_SPINUP_JOULES, idle_watts=DEFAULT_IDLE_WATTS,
+                 standby_watts=DEFAULT_STANDBY_WATTS, read_seconds=DEFAULT_READ_SECONDS):
+        if standby_timeout <= 0:
+            raise ValueError("休眠超时必须大于0")
+        self.standby_timeout = standby_timeout
+        self.spinup_seconds = spinup_seconds
+        self.spinup_joules = spinup_joules
+        self.idle_watts = idle_watts
+        self.standby_watts = standby_watts
+        self.read_seconds = read_seconds
+
+        # 模拟开始时硬盘刚被访问过
+        self.spinning = True
+        self.last_access = 0.0
+        self.accesses = 0
+        self.spinups = 0
+        self.foreground_spinups = 0
+        self.standby_seconds = 0.0
+        self._stopped_at = None
+
+    def _settle(self, now):
+        if self.spinning and now - self.last_access >= self.standby_timeout:
+            self.spinning = False
+            self._stopped_at = self.last_access + self.standby_timeout
+
+    def access(self, now, foreground=False):
+        """在 now 访问硬盘，返回本次访问的延迟（秒）"""
+        self._settle(now)
+        self.accesses += 1
+        latency = self.read_seconds
+        if not self.spinning:
+            self.spinning = True
+            self.spinups += 1
+            if foreground:
+                self.foreground_spinups += 1
+            self.standby_seconds += now - self._stopped_at
+            latency = self.spinup_seconds
+        self.last_access = now
+        return latency
+
+    def finish(self, end):
+        """结算到 end 为止的停转时间"""
+        self._settle(end)
+        if not self.spinning:
+            self.standby_seconds += end - self._stopped_at
+            self._stopped_at = end
+
+    def energy_joules(self, duration):
+        spinning = max(0.0, duration - self.standby_seconds)
+        return (spinning * self.idle_watts + self.standby_seconds * self.standby_watts
+                + self.spinups * self.spinup_joules)
+
+
+class ModelEngine(ReadEngine):
+    """读取即访问硬盘模型，并把模型给出的延迟计入虚拟计时器"""
+
+    def __init__(self, drive, clock):
+        super().__init__()
+        self.drive = drive
+        self.clock = clock
+
+    def read(self, path):
+        self.clock.ns += int(self.drive.access(self.clock.now) * 1e9)
+
+
+class ModelActivityProbe:
+    """忙时跳过的设备活动探针：比较硬盘模型的访问计数"""
+
+    def __init__(self, drive):
+        self.drive = drive
+        self._baseline = None
+
+    def mark(self):
+        self._baseline = self.drive.accesses
+
+    def reset(self):
+        self._baseline = None
+
+    def busy(self):
+        baseline, self._baseline = self._baseline, None
+        return baseline is not None and self.drive.accesses != baseline
+
+
+def parse_policy(text):
+    """解析策略说明，返回参数字典"""
+    name, _, rest = text.partition(":")
+    if name == "none":
+        return {"policy": text, "interval": None, "adaptive": False, "skip_busy": False}
+    kinds = set(name.split("+"))
+    if not kinds <= {"fixed", "adaptive", "busy"} or kinds == {"fixed", "adaptive"}:
+        raise ValueError(f"未知的策略: {text}")
+    try:
+        numbers = [float(value) for value in rest.split(":")] if rest else []
+    except ValueError:
+        raise ValueError(f"策略 {text} 的间隔必须是数字")
+    if not 1 <= len(numbers) <= 2 or numbers[0] <= 0:
+        raise ValueError(f"策略 {text} 需要一个大于0的间隔")
+    return {"policy": text, "interval": numbers[0], "adaptive": "adaptive" in kinds,
+            "max_interval": numbers[1] if len(numbers) > 1 else max(numbers[0], DEFAULT_MAX_INTERVAL),
+            "skip_busy": "busy" in kinds}
+
+
+def simulate(events, duration, policy, drive_options):
+    """用一种策略回放前台 I/O（时刻相对记录开始），返回统计结果"""
+    clock = SimulatedClock()
+    drive = DriveModel(**drive_options)
+    scheduler = target = None
+    deadline = None
+    if policy["interval"] is not None:
+        scheduler = KeepAliveScheduler(clock=clock, detect_suspend=False, workers=0,
+                                       timer=clock.timer)
+        interval = policy["interval"]
+        adaptive = None
+        if policy["adaptive"]:
+            adaptive = AdaptiveInterval(interval, minimum=min(5, interval),
+                                        maximum=max(interval, policy["max_interval"]))
+        target = KeepAliveTarget(SIMULATED_PATH, interval, engine=ModelEngine(drive, clock),
+                                 adaptive=adaptive)
+        if policy["skip_busy"]:
+            target.busy_probe = ModelActivityProbe(drive)
+        scheduler.add(target)
+        deadline = scheduler.run_pending()
+
+    index = 0
+    while True:
+        event = events[index] if index < len(events) else None
+        if deadline is not None and deadline > duration:
+            deadline = None
+        if event is None and deadline is None:
+            break
+        if deadline is None or (event is not None and event <= deadline):
+            clock.now = event
+            drive.access(event, foreground=True)
+            index += 1
+        else:
+            clock.now = deadline
+            deadline = scheduler.run_pending()
+    drive.finish(duration)
+
+    hours = duration / 3600 or 1
+    result = {
+        "policy": policy["policy"],
+        "keepalive_reads": target.count if target is not None else 0,
+        "suppressed": target.suppressed if target is not None else 0,
+        "spinups": drive.spinups,
+        "foreground_spinups": drive.foreground_spinups,
+        "keepalive_spinups": drive.spinups - drive.foreground_spinups,
+        "standby_fraction": drive.standby_seconds / duration if duration else 0.0,
+        "energy_wh": drive.energy_joules(duration) / 3600,
+    }
+    result["keepalive_reads_per_hour"] = result["keepalive_reads"] / hours
+    if target is not None and target.adaptive is not None:
+        result["final_interval"] = target.interval
+    return result
+
+
+def format_table(results):
+    header = f"{'策略':<20}{'保活读取':>10}{'跳过':>8}{'起转':>6}{'前台起转':>8}{'停转比例':>8}{'能耗 Wh':>10}"
+    lines = [header]
+    for r in results:
+        lines.append(f"{r['policy']:<20}{r['keepalive_reads']:>12}{r['suppressed']:>10}{r['spinups']:>8}"
+                     f"{r['foreground_spinups']:>12}{r['standby_fraction']:>11.1%}{r['energy_wh']:>12.1f}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="simulator.py", description="保活策略模拟器")
+    parser.add_argument("trace", help="diskstats 采样或读取延迟记录文件")
+    parser.add_argument("--device", help="diskstats 记录中要回放的设备名（如 sdb）")
+    parser.add_argument("-p", "--policy", action="append", metavar="POLICY",
+                        help="要比较的策略，可重复指定，默认 " + " ".join(DEFAULT_POLICIES))
+    parser.add_argument("--standby-timeout", type=float, default=DEFAULT_STANDBY_TIMEOUT,
+                        help="硬盘休眠超时（秒），默认 %(default)s")
+    parser.add_argument("--spinup-seconds", type=float,
+                        help=f"起转耗时（秒），默认取延迟记录中唤醒延迟的中位数，没有时为 {DEFAULT_SPINUP_SECONDS}")
+    parser.add_argument("--spinup-joules", type=float, default=DEFAULT_SPINUP_JOULES,
+                        help="每次起转额外消耗的能量（焦耳），默认 %(default)s")
+    parser.add_argument("--idle-watts", type=float, default=DEFAULT_IDLE_WATTS,
+                        help="转动时的功率（瓦），默认 %(default)s")
+    parser.add_argument("--standby-watts", type=float, default=DEFAULT_STANDBY_WATTS,
+                        help="停转时的功率（瓦），默认 %(default)s")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        events, latencies = load_trace(args.trace, args.device)
+        policies = [parse_policy(text) for text in (args.policy or DEFAULT_POLICIES)]
+    except ValueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 2
+    if not events:
+        print("错误: 记录中没有前台 I/O", file=sys.stderr)
+        return 2
+
+    spinup_seconds = args.spinup_seconds
+    if spinup_seconds is None:
+        spinup_seconds = estimate_spinup(latencies) or DEFAULT_SPINUP_SECONDS
+    drive_options = {"standby_timeout": args.standby_timeout, "spinup_seconds": spinup_seconds,
+                     "spinup_joules": args.spinup_joules, "idle_watts": args.idle_watts,
+                     "standby_watts": args.standby_watts}
+    start = events[0]
+    relative = [event - start for event in events]
+    duration = relative[-1]
+
+    results = []
+    begin = time.perf_counter()
+    for policy in policies:
+        try:
+            results.append(simulate(relative, duration, policy, drive_options))
+        except ValueError as e:
+            print(f"错误: {e}", file=sys.stderr)
+            return 2
+    elapsed = time.perf_counter() - begin
+
+    summary = {"trace": args.trace, "events": len(events), "duration_hours": duration / 3600,
+               "drive": drive_options, "results": results,
+               "speedup": duration * len(policies) / elapsed if elapsed > 0 else None}
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+    else:
+        print(f"记录 {args.trace}：{len(events)} 次前台 I/O，时长 {duration / 3600:.1f} 小时；"
+              f"休眠超时 {args.standby_timeout:.0f} 秒，起转 {spinup_seconds:.1f} 秒")
+        print(format_table(results))
+        if summary["speedup"]:
+            print(f"模拟耗时 {elapsed:.2f} 秒（约为实时的 {summary['speedup']:.0f} 倍）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+单实例 - 再次启动时把目标交给已在运行的实例
+
+图形界面启动时先连接本机的本地套接字（Windows 上为命名管道，其它平台为
+Unix 域套接字，由 QLocalSocket 封装）：连接成功说明已有实例在运行，把命令行中的
+路径发给它后退出，由它加入调度（同一硬盘上的路径会合并）并显示窗口；
+连接失败则由本实例开始监听。套接字只允许当前用户访问。
+设置环境变量 HDD_KEEPALIVE_INSTANCE 可使用另外的套接字名（如基准测试与日常使用的实例互不干扰）。
+
+消息为一行 JSON：{"paths": [...]}，运行中的实例处理后回复一行 ok。
+"""
+import os
+import json
+import getpass
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+CONNECT_TIMEOUT_MS = 500
+
+ENV_VAR = "HDD_KEEPALIVE_INSTANCE"
+
+
+def server_name():
+    """按用户区分的套接字名，不同用户各自运行一个实例"""
+    if os.environ.get(ENV_VAR):
+        return os.environ[ENV_VAR]
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "default"
+    return "hdd-keepalive-" + "".join(c if c.isalnum() else "_" for c in user)
+
+
+def send_to_running(paths, name=None, timeout=CONNECT_TIMEOUT_MS):
+    """把路径交给已在运行的实例，返回是否送达；没有实例在运行时返回 False"""
+    # 对方的工作目录与本进程不同，只发送绝对路径
+    paths = [os.path.abspath(path) for path in paths]
+    socket = QLocalSocket()
+    socket.connectToServer(name or server_name())
+    if not socket.waitForConnected(timeout):
+        return False
+    try:
+        socket.write((json.dumps({"paths": paths}, ensure_ascii=False) + "\n").encode("utf-8"))
+        return socket.waitForBytesWritten(timeout) and socket.waitForReadyRead(timeout)
+    finally:
+        socket.disconnectFromServer()
+
+
+class InstanceServer(QObject):
+    """接收后续启动发来的路径，通过 attached 信号交给窗口"""
+
+    attached = pyqtSignal(list)
+
+    def __init__(self, name=None, parent=None):
+        super().__init__(parent)
+        self.name = name or server_name()
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._on_connection)
+
+    def listen(self):
+        """开始监听，返回是否成功"""
+        if self.server.listen(self.name):
+            return True
+        probe = QLocalSocket()
+        probe.connectToServer(self.name)
+        if probe.waitForConnected(CONNECT_TIMEOUT_MS):
+            # 另一个实例刚好同时启动并抢先监听
+            probe.disconnectFromServer()
+            return False
+        # 上次异常退出后残留的套接字文件（Unix）
+        QLocalServer.removeServer(self.name)
+        return self.server.listen(self.name)
+
+    def close(self):
+        self.server.close()
+
+    def _on_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self._on_ready_read(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _on_ready_read(self, socket):
+        if not socket.canReadLine():
+            return
+        line = bytes(socket.readLine()).decode("utf-8", "replace")
+        try:
+            paths = [str(path) for path in json.loads(line)["paths"]]
+        except (ValueError, KeyError, TypeError):
+            socket.disconnectFromServer()
+            return
+        socket.write(b"ok\n")
+        socket.flush()
+        self.attached.emit(paths)
@@ -0,0 +1,135 @@
+"""
+错峰调度 - 避免共用 USB hub、控制器或电源的多块硬盘同时读取、同时起转
+
+多个目标同时加入、间隔相同时，它们的读取会一直对齐：每个周期所有硬盘在同一时刻
+被读取，休眠的硬盘一起起转，电流尖峰叠加，读取延迟也互相拖累。StaggerPolicy
+从三方面把读取错开，且都不会让两次读取的间隔超过目标的 interval：
+
+- 错相：目标加入、恢复或系统挂起后第一次读取完成时，把下一次读取安排在
+  同组其它目标读取时刻之间最大的空档中央，只会提前、不会推迟；
+- 抖动：之后每次读取在 interval 之前随机提前至多 jitter × interval，
+  使间隔略有差异的目标不会长期同相（代价是平均多读约 jitter / 2）；
+- 令牌：同组设备同一时间最多 concurrency 个读取在进行，其余排队，
+  前一个读取结束即开始；排队最晚等到距上次读取满 interval 时，届时不论有无令牌都开始。
+
+分组默认取磁盘在 sysfs 中的拓扑（Linux）：USB 硬盘按所接的 hub（或根 hub）分组，
+其它硬盘按所在的 PCI 控制器分组；共用同一电源但拓扑上看不出来的硬盘，
+可以为目标指定相同的 group。无法解析拓扑时（Windows 等）所有目标同为一组。
+"""
+import os
+import re
+import random
+from collections import deque
+
+from diskstats import resolve_device_path
+
+DEFAULT_JITTER = 0.05
+DEFAULT_CONCURRENCY = 1
+
+DEFAULT_GROUP = "default"
+
+# sysfs 路径中的 USB 设备目录（如 2-1、2-1.3）和 PCI 设备目录（如 0000:00:14.0）
+_USB_DEVICE = re.compile(r"^\d+-\d+(\.\d+)*$")
+_PCI_DEVICE = re.compile(r"^[0-9a-f]{4}:[0-9a-f]{2}:[0-9a-f]{2}\.[0-9a-f]$")
+
+
+def topology_group(device_path):
+    """根据磁盘的 sysfs 路径返回分组名：所接的 USB hub、PCI 控制器，或磁盘本身"""
+    parts = device_path.split("/")
+    usb = [i for i, part in enumerate(parts) if _USB_DEVICE.match(part)]
+    if usb:
+        # 最后一级 USB 设备是硬盘盒本身，它的上一级是 hub（直连时为根 hub，如 usb2）
+        return "usb:" + parts[usb[-1] - 1]
+    pci = [part for part in parts if _PCI_DEVICE.match(part)]
+    if pci:
+        return "pci:" + pci[-1]
+    return "dev:" + os.path.basename(device_path)
+
+
+def device_group(path):
+    """文件所在磁盘的分组名，无法解析时返回 DEFAULT_GROUP"""
+    device_path = resolve_device_path(path)
+    if device_path is None:
+        return DEFAULT_GROUP
+    return topology_group(device_path)
+
+
+class ReadGate:
+    """一组设备的读取令牌；所有方法由调度器在持锁时调用"""
+
+    def __init__(self, name, tokens=DEFAULT_CONCURRENCY):
+        if tokens < 1:
+            raise ValueError("并发读取数必须大于0")
+        self.name = name
+        self.tokens = tokens
+        self.in_use = 0
+        self.waiting = deque()
+        # 排队等过令牌的读取次数、等到最晚时刻仍无令牌而强制开始的次数
+        self.deferred = 0
+        self.forced = 0
+
+    def acquire(self):
+        """取得一个令牌，没有空闲令牌时返回 False"""
+        if self.in_use >= self.tokens:
+            return False
+        self.in_use += 1
+        return True
+
+    def force(self):
+        """不论有无空闲令牌都占用一个"""
+        self.in_use += 1
+        self.forced += 1
+
+    def release(self):
+        self.in_use = max(0, self.in_use - 1)
+
+
+class StaggerPolicy:
+    """调度器的错峰策略：错相、抖动与按组限制并发读取"""
+
+    def __init__(self, jitter=DEFAULT_JITTER, concurrency=DEFAULT_CONCURRENCY,
+                 group_of=device_group, seed=None):
+        if not 0 <= jitter < 1:
+            raise ValueError("抖动比例必须在 0 到 1 之间")
+        if concurrency < 1:
+            raise ValueError("并发读取数必须大于0")
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.group_of = group_of
+        self._random = random.Random(seed)
+        self._gates = {}
+
+    def group(self, target):
+        """目标所属分组：显式指定的 group 优先，否则按设备拓扑"""
+        return target.group or self.group_of(target.path)
+
+    def gate(self, group):
+        """分组的读取令牌，首次使用时创建"""
+        gate = self._gates.get(group)
+        if gate is None:
+            gate = self._gates.setdefault(group, ReadGate(group, self.concurrency))
+        return gate
+
+    def gates(self):
+        return list(self._gates.values())
+
+    def offset(self, interval):
+        """本次读取相对 interval 提前的秒数"""
+        return self._random.uniform(0, self.jitter * interval)
+
+    def place(self, now, interval, deadlines):
+        """
+        在 (now, now + interval] 中为目标选一个读取时刻，返回截止时间
+
+        把同组其它目标的截止时间按 interval 取模视为周期上的点，
+        选最大空档的中点；同组没有其它目标时按抖动规则处理。
+        """
+        if not deadlines:
+            return now + interval - self.offset(interval)
+        phases = sorted((deadline - now) % interval for deadline in deadlines)
+        best_gap, best_start = phases[0] + interval - phases[-1], phases[-1]
+        for previous, current in zip(phases, phases[1:]):
+            if current - previous > best_gap:
+                best_gap, best_start = current - previous, previous
+        phase = (best_start + best_gap / 2) % interval
+        return now + (phase or interval)
@@ -0,0 +1,140 @@
+"""
+启动计时 - 记录从进程创建到首个窗口、首次保活读取的各阶段耗时
+
+设置环境变量 HDD_KEEPALIVE_PROFILE_STARTUP 后启用：值为 1 时把耗时表输出到标准错误，
+其它值视为文件路径，以 JSON 写入（打包成无控制台程序后看不到标准错误）。
+未设置时 mark() 只做一次判断，不影响启动速度。
+
+时间从进程创建算起（Linux 读 /proc/self/stat，Windows 调 GetProcessTimes），
+因此包含解释器初始化和 PyInstaller 解包；取不到时从本模块被导入时算起。
+本模块只依赖标准库，应在 main.py 中最先导入。
+"""
+import os
+import sys
+import json
+import time
+import threading
+
+ENV_VAR = "HDD_KEEPALIVE_PROFILE_STARTUP"
+
+
+def _linux_uptime():
+    with open("/proc/self/stat", "rb") as f:
+        stat = f.read()
+    # 进程名可能含空格，从最后一个右括号之后开始按空格拆分，starttime 是第 22 个字段
+    fields = stat[stat.rindex(b")") + 2:].split()
+    started = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    return time.clock_gettime(time.CLOCK_BOOTTIME) - started
+
+
+def _windows_uptime():
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.windll.kernel32
+    creation, exit_, kernel, user, now = (wintypes.FILETIME() for _ in range(5))
+    if not kernel32.GetProcessTimes(kernel32.GetCurrentProcess(), ctypes.byref(creation),
+                                    ctypes.byref(exit_), ctypes.byref(kernel), ctypes.byref(user)):
+        raise OSError("GetProcessTimes 调用失败")
+    kernel32.GetSystemTimePreciseAsFileTime(ctypes.byref(now))
+
+    def ticks(filetime):
+        return (filetime.dwHighDateTime << 32) | filetime.dwLowDateTime
+
+    # FILETIME 以 100 纳秒为单位
+    return (ticks(now) - ticks(creation)) / 1e7
+
+
+def process_uptime():
+    """进程创建至今的秒数，不支持的平台返回 None"""
+    try:
+        if sys.platform.startswith("linux"):
+            return _linux_uptime()
+        if sys.platform == "win32":
+            return _windows_uptime()
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    return None
+
+
+class StartupProfile:
+    """按顺序记录启动阶段，每个阶段记录距进程创建的时间"""
+
+    def __init__(self, destination=None):
+        self.destination = destination or None
+        self.marks = []
+        self.reported = False
+        self._expected = ()
+        self._lock = threading.Lock()
+        uptime = process_uptime() if self.destination else None
+        self.since_process_start = uptime is not None
+        self._origin = time.perf_counter() - (uptime or 0.0)
+        if self.destination:
+            self.mark("解释器启动")
+
+    @property
+    def enabled(self):
+        return self.destination is not None
+
+    def expect(self, *names):
+        """这些阶段都记录之后自动输出耗时表"""
+        self._expected = names
+        self._report_if_complete()
+
+    def mark(self, name):
+        """记录阶段 name 在此刻结束；只记录第一次，可在任意线程调用"""
+        if self.destination is None or self.reported:
+            return
+        with self._lock:
+            if any(existing == name for existing, _ in self.marks):
+                return
+            self.marks.append((name, time.perf_counter() - self._origin))
+        self._report_if_complete()
+
+    def _report_if_complete(self):
+        if self._expected and all(self.elapsed(name) is not None for name in self._expected):
+            self.report()
+
+    def elapsed(self, name):
+        for existing, at in self.marks:
+            if existing == name:
+                return at
+        return None
+
+    def as_dict(self):
+        phases = []
+        previous = 0.0
+        for name, at in self.marks:
+            phases.append({"phase": name, "at_ms": round(at * 1000, 2),
+                           "duration_ms": round((at - previous) * 1000, 2)})
+            previous = at
+        return {"pid": os.getpid(), "since_process_start": self.since_process_start,
+                "phases": phases}
+
+    def format(self):
+        lines = ["启动耗时（毫秒，" + ("自进程创建" if self.since_process_start else "自导入计时模块") + "）:"]
+        for phase in self.as_dict()["phases"]:
+            lines.append(f"  {phase['at_ms']:>8.1f}  (+{phase['duration_ms']:.1f})  {phase['phase']}")
+        return "\n".join(lines)
+
+    def report(self):
+        """输出一次耗时表，之后的 mark() 不再记录"""
+        with self._lock:
+            if self.destination is None or self.reported:
+                return
+            self.reported = True
+        try:
+            if self.destination == "1":
+                print(self.format(), file=sys.stderr)
+            else:
+                # 先写临时文件再改名，读取方不会看到写了一半的内容
+                temp = self.destination + ".tmp"
+                with open(temp, "w", encoding="utf-8") as f:
+                    json.dump(self.as_dict(), f, ensure_ascii=False, indent=2)
+                os.replace(temp, self.destination)
+        except (OSError, ValueError):
+            # 计时只用于诊断，输出失败不影响程序运行
+            pass
+
+
+profile = StartupProfile(os.environ.get(ENV_VAR))
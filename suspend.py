@@ -0,0 +1,49 @@
+"""
+系统挂起检测 - 比较 CLOCK_BOOTTIME 与 CLOCK_MONOTONIC（Linux）
+
+两个时钟都不受系统时间调整影响，区别在于 CLOCK_BOOTTIME 在系统挂起期间
+继续计时，CLOCK_MONOTONIC（time.monotonic）则暂停。两者的差值平时恒定，
+从挂起中恢复后增加的部分就是挂起时长。
+
+调度器的截止时间基于 time.monotonic，挂起期间不会"到期"，恢复后也不会
+一次补读多个周期；但挂起期间硬盘多半已经休眠或被 USB 重新枚举，
+因此检测到恢复时应立即补读一次。
+
+其它平台没有这对时钟，supported 为 False，check() 总是返回 0。
+"""
+import time
+
+CLOCK_BOOTTIME = getattr(time, "CLOCK_BOOTTIME", None)
+
+# 低于该时长的差值视为读取两个时钟之间的计时噪声
+DEFAULT_THRESHOLD = 1.0
+
+
+def _clock_offset():
+    return time.clock_gettime(CLOCK_BOOTTIME) - time.clock_gettime(time.CLOCK_MONOTONIC)
+
+
+class SuspendDetector:
+    """检测两次 check() 之间系统是否挂起过"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.supported = CLOCK_BOOTTIME is not None
+        self._offset = None
+        if self.supported:
+            try:
+                self._offset = _clock_offset()
+            except OSError:
+                # 内核过旧（< 2.6.39）不支持 CLOCK_BOOTTIME
+                self.supported = False
+
+    def check(self):
+        """返回自上次检测到挂起以来新增的挂起秒数，未挂起时返回 0"""
+        if not self.supported:
+            return 0.0
+        offset = _clock_offset()
+        gap = offset - self._offset
+        if gap < self.threshold:
+            return 0.0
+        self._offset = offset
+        return gap
@@ -0,0 +1,231 @@
+"""
+目标状态表 - 所有保活目标共用一个 QAbstractTableModel
+
+调度线程和读取线程在事件发生时为目标生成一行不可变快照（TargetRow），
+按目标合并后由界面定时器以几 Hz 的频率成批取走；模型只对与上一行相比
+真正变化的单元格发出 dataChanged，视图也只重绘其中可见的部分。
+倒计时和运行时间由模型根据 tick() 传入的时间计算，每秒只发出两个整列的
+dataChanged，而不是每个目标一个信号，几百个目标时界面依然流畅。
+"""
+import time
+from collections import namedtuple
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QBrush, QColor
+
+from latency import format_latency
+from write_engine import WriteEngine
+
+TargetRow = namedtuple("TargetRow", (
+    "path", "state", "count", "suppressed", "skip_busy", "p50", "p99", "spinups",
+    "interval", "adaptive", "next_deadline", "last_read_time", "started_at", "writes"))
+
+# 写入保活的统计，读取保活的目标为 None
+WriteStats = namedtuple("WriteStats", ("writes", "bytes_written", "fsyncs", "budget_skips", "amplification"))
+
+COLUMNS = ("目标", "状态", "读取次数", "延迟 p50/p99", "唤醒", "间隔", "下次读取", "最后读取", "运行时间")
+COL_PATH, COL_STATE, COL_COUNT, COL_LATENCY, COL_SPINUPS, COL_INTERVAL, \
+    COL_COUNTDOWN, COL_LAST_READ, COL_RUNTIME = range(len(COLUMNS))
+
+# TargetRow 各字段影响的列
+_FIELD_COLUMNS = (COL_PATH, COL_STATE, COL_COUNT, COL_COUNT, COL_COUNT, COL_LATENCY, COL_LATENCY,
+                  COL_SPINUPS, COL_INTERVAL, COL_INTERVAL, COL_COUNTDOWN, COL_LAST_READ, COL_RUNTIME,
+                  COL_COUNT)
+
+STATE_TEXT = {
+    "pending": "准备中",
+    "running": "运行中",
+    "paused": "已暂停",
+    "stalled": "无响应",
+    "offline": "离线",
+    "error": "错误",
+    "finished": "已完成",
+    "removed": "已停止",
+}
+
+STATE_COLORS = {
+    "running": "#00b894",
+    "paused": "#636e72",
+    "stalled": "#e17055",
+    "offline": "#fdcb6e",
+    "error": "#d63031",
+}
+
+
+def target_row(target):
+    """在事件发生的线程中为目标生成一行快照"""
+    latency = target.latency
+    adaptive = None
+    if target.adaptive is not None:
+        adaptive = "已收敛" if target.adaptive.settled else "探测中"
+    writes = None
+    engine = target.engine
+    if isinstance(engine, WriteEngine):
+        writes = WriteStats(engine.writes, engine.bytes_written, engine.fsyncs,
+                            engine.budget_skips, engine.amplification)
+    return TargetRow(
+        target.path, target.state, target.count, target.suppressed, target.busy_probe is not None,
+        latency.p50, latency.p99, latency.spinups, target.interval, adaptive,
+        target.next_deadline, target.last_read_time, target.started_at, writes)
+
+
+def write_tooltip(writes):
+    """写入保活统计的提示文字"""
+    amplification = "--" if writes.amplification is None else f"{writes.amplification:.1f}x"
+    return (f"写入 {writes.writes} 次，共 {writes.bytes_written // 1024} KB，fsync {writes.fsyncs} 次\n"
+            f"超出预算改为读取 {writes.budget_skips} 次\n"
+            f"写放大 {amplification}")
+
+
+class TargetTableModel(QAbstractTableModel):
+    """按目标 ID 维护行快照，成批应用差异"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ids = []
+        self._rows = []
+        self._positions = {}
+        self._now = None
+        self._brushes = {state: QBrush(QColor(color)) for state, color in STATE_COLORS.items()}
+
+    # ---------- Qt 接口 ----------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            return self._display(row, column)
+        if role == Qt.ForegroundRole and column == COL_STATE:
+            return self._brushes.get(row.state)
+        if role == Qt.ToolTipRole and column == COL_PATH:
+            return row.path
+        if role == Qt.ToolTipRole and column == COL_COUNT and row.writes is not None:
+            return write_tooltip(row.writes)
+        if role == Qt.TextAlignmentRole and column >= COL_COUNT:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def _display(self, row, column):
+        if column == COL_PATH:
+            return row.path
+        if column == COL_STATE:
+            return "● " + STATE_TEXT.get(row.state, row.state)
+        if column == COL_COUNT:
+            notes = []
+            if row.writes is not None:
+                notes.append(f"写入 {row.writes.writes}")
+                if row.writes.budget_skips:
+                    notes.append(f"超预算 {row.writes.budget_skips}")
+            if row.skip_busy:
+                notes.append(f"跳过 {row.suppressed}")
+            if notes:
+                return f"{row.count}（{'，'.join(notes)}）"
+            return str(row.count)
+        if column == COL_LATENCY:
+            return f"{format_latency(row.p50)} / {format_latency(row.p99)}"
+        if column == COL_SPINUPS:
+            return str(row.spinups)
+        if column == COL_INTERVAL:
+            text = f"{row.interval:.0f} 秒"
+            return f"{text}（{row.adaptive}）" if row.adaptive else text
+        if column == COL_COUNTDOWN:
+            if row.state == "paused":
+                return "已暂停"
+            if row.state == "stalled":
+                return "等待响应"
+            if row.next_deadline is None or self._now is None:
+                return "--"
+            remaining = max(0, int(row.next_deadline - self._now + 0.999))
+            if row.state == "offline":
+                return f"{remaining} 秒后重试"
+            return f"{remaining} 秒"
+        if column == COL_LAST_READ:
+            if row.last_read_time is None:
+                return "--"
+            return time.strftime("%H:%M:%S", time.localtime(row.last_read_time))
+        if column == COL_RUNTIME:
+            if row.started_at is None or self._now is None:
+                return "--"
+            elapsed = max(0, int(self._now - row.started_at))
+            return f"{elapsed // 3600:02d}:{elapsed % 3600 // 60:02d}:{elapsed % 60:02d}"
+        return None
+
+    # ---------- 更新 ----------
+
+    def target_id(self, row):
+        return self._ids[row]
+
+    def row_of(self, target_id):
+        """目标所在行号，不存在时为 None"""
+        return self._positions.get(target_id)
+
+    def snapshot(self, target_id):
+        position = self._positions.get(target_id)
+        return None if position is None else self._rows[position]
+
+    def rows(self):
+        return list(self._rows)
+
+    def apply(self, diffs):
+        """
+        应用一批 {目标ID: TargetRow 或 None}，None 表示目标已离开
+
+        返回是否有行被增删（调用方据此刷新汇总信息）。
+        """
+        removed = sorted((self._positions[i] for i, row in diffs.items()
+                          if row is None and i in self._positions), reverse=True)
+        for position in removed:
+            self.beginRemoveRows(QModelIndex(), position, position)
+            del self._ids[position]
+            del self._rows[position]
+            self.endRemoveRows()
+        if removed:
+            self._positions = {target_id: i for i, target_id in enumerate(self._ids)}
+
+        added = []
+        for target_id, row in diffs.items():
+            if row is None:
+                continue
+            position = self._positions.get(target_id)
+            if position is None:
+                added.append((target_id, row))
+                continue
+            old = self._rows[position]
+            if old == row:
+                continue
+            self._rows[position] = row
+            changed = [_FIELD_COLUMNS[i] for i, (a, b) in enumerate(zip(old, row)) if a != b]
+            self.dataChanged.emit(self.index(position, min(changed)),
+                                  self.index(position, max(changed)), [Qt.DisplayRole])
+
+        if added:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            for target_id, row in added:
+                self._positions[target_id] = len(self._rows)
+                self._ids.append(target_id)
+                self._rows.append(row)
+            self.endInsertRows()
+        return bool(removed or added)
+
+    def tick(self, now):
+        """更新倒计时和运行时间所用的当前时间，只通知这两列"""
+        self._now = now
+        if not self._rows:
+            return
+        last = len(self._rows) - 1
+        for column in (COL_COUNTDOWN, COL_RUNTIME):
+            self.dataChanged.emit(self.index(0, column), self.index(last, column), [Qt.DisplayRole])
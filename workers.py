@@ -0,0 +1,119 @@
+"""
+读取线程池 - 让卡住的读取只影响它自己的目标
+
+U 盘或硬盘盒掉线时，读取可能在内核中进入不可中断等待，永远不返回，
+这样的线程（或进程）无法被强制结束。因此调度线程不再自己执行读取，
+而是把读取交给少量工作线程，由调度器的看门狗检查超时：
+超时的读取所在线程被"放弃"——移出线程池，由新线程顶替，
+它若日后返回就自行退出。每个目标同一时间最多一个读取在进行，
+一块掉线的硬盘最多占住一个线程，其它硬盘照常按时读取。
+
+选择线程而非进程：卡在 D 状态的进程同样杀不掉，而读取引擎持有对齐缓冲区、
+轮换偏移等状态，放在进程内更简单。
+"""
+import time
+import queue
+import itertools
+import threading
+
+DEFAULT_WORKERS = 4
+
+
+class ReadJob:
+    """一次提交给线程池的读取"""
+
+    __slots__ = ("target", "submitted", "started", "worker", "gate", "deadline")
+
+    def __init__(self, target, submitted, deadline=None):
+        self.target = target
+        self.submitted = submitted
+        self.started = None
+        self.worker = None
+        # 本次读取原定的截止时间，与 started 之差即调度偏差；None 时不统计
+        self.deadline = deadline
+        # 错峰调度下该读取占用的分组令牌
+        self.gate = None
+
+
+class ReadWorkerPool:
+    """按需创建、最多 size 个线程的读取池"""
+
+    def __init__(self, run, size=DEFAULT_WORKERS, clock=time.monotonic):
+        if size <= 0:
+            raise ValueError("线程数必须大于0")
+        self.size = size
+        self.clock = clock
+        self.recycled = 0
+        self._run = run
+        self._queue = queue.SimpleQueue()
+        self._workers = set()
+        self._closed = []
+        self._idle = 0
+        self._lock = threading.Lock()
+        self._names = itertools.count(1)
+
+    def submit(self, job):
+        """排队执行 job；没有空闲线程且未达上限时新建线程"""
+        with self._lock:
+            if self._idle > 0:
+                self._idle -= 1
+            elif len(self._workers) < self.size:
+                self._spawn()
+        self._queue.put(job)
+
+    def _spawn(self):
+        worker = threading.Thread(target=self._work, name=f"keepalive-reader-{next(self._names)}")
+        worker.daemon = True
+        self._workers.add(worker)
+        worker.start()
+
+    def _work(self):
+        me = threading.current_thread()
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                job.worker = me
+                job.started = self.clock()
+            try:
+                self._run(job)
+            finally:
+                with self._lock:
+                    if me not in self._workers:
+                        # 已被放弃，顶替的线程负责后续任务
+                        return
+                    self._idle += 1
+
+    def recycle(self, job):
+        """放弃正在执行 job 的线程；下次提交时会补充新线程"""
+        with self._lock:
+            if job.worker in self._workers:
+                self._workers.discard(job.worker)
+                self.recycled += 1
+
+    @property
+    def workers(self):
+        """池中仍在服役的线程数（不含已放弃的）"""
+        with self._lock:
+            return len(self._workers)
+
+    def close(self):
+        """通知所有线程在手头的读取结束后退出；卡住的线程为守护线程，不阻止进程退出"""
+        with self._lock:
+            count = len(self._workers)
+            self._closed.extend(self._workers)
+            self._workers.clear()
+            self._idle = 0
+        for _ in range(count):
+            self._queue.put(None)
+
+    def join(self, timeout=None):
+        """close() 之后等待进行中的读取结束，最多 timeout 秒；返回是否全部结束"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            workers = list(self._closed)
+        for worker in workers:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            worker.join(remaining)
+        return not any(worker.is_alive() for worker in workers)
@@ -0,0 +1,210 @@
+"""
+写入保活 - 针对只在写入时才重置空闲计时的 USB 硬盘盒
+
+部分 USB 桥接芯片只把写命令当作活动，读取再频繁硬盘也会按时休眠。
+写入模式每次到期改写哨兵文件中的一个块（随机数据，按块轮换偏移），
+可选 fdatasync 让写入立即到达设备，而不是等内核回写。
+
+写入会消耗 SSD 寿命，因此每块硬盘（按整块磁盘区分，同一硬盘不同分区上的目标也共用）
+有一份滑动窗口预算：每天最多写入的字节数、每小时最多 fsync 的次数。
+每次到期最多写一个块；字节预算用尽时退回为普通保活读取，
+fsync 预算用尽时只写入不落盘。
+
+开启 fsync 时，会比较写入前后块设备的写扇区计数，估算写放大
+（设备实际写入 / 本工具写入的字节数，包含文件系统日志和元数据）。
+计数按整块磁盘统计，其它进程同时写入会使估算偏高，宜在硬盘空闲时观察。
+"""
+import os
+import time
+import threading
+from collections import deque
+
+from diskstats import SECTOR_SIZE, read_written_sectors, resolve_block_device
+from read_engine import BLOCK_SIZE, ReadEngine, create_read_engine
+from sentinel import SENTINEL_NAME
+
+# 默认预算：60 秒间隔写 4K 每天约 5.6MB
+DEFAULT_BYTES_PER_DAY = 16 * 1024 * 1024
+DEFAULT_FSYNCS_PER_HOUR = 60
+
+_DAY = 86400
+_HOUR = 3600
+
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+
+class WriteBudget:
+    """单块硬盘的写入预算（滑动窗口），可被多个线程共用"""
+
+    _registry = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, bytes_per_day=DEFAULT_BYTES_PER_DAY, fsyncs_per_hour=DEFAULT_FSYNCS_PER_HOUR,
+                 clock=time.monotonic):
+        if bytes_per_day <= 0:
+            raise ValueError("每天写入预算必须大于0")
+        if fsyncs_per_hour < 0:
+            raise ValueError("每小时 fsync 次数不能为负数")
+        self.bytes_per_day = bytes_per_day
+        self.fsyncs_per_hour = fsyncs_per_hour
+        self.clock = clock
+        self._writes = deque()
+        self._written = 0
+        self._fsyncs = deque()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, path, bytes_per_day=DEFAULT_BYTES_PER_DAY,
+                 fsyncs_per_hour=DEFAULT_FSYNCS_PER_HOUR):
+        """
+        同一块硬盘上的文件共用一份预算；先创建者的限额生效
+
+        按所在的整块磁盘区分（不同分区共用），无法解析块设备时退回 st_dev。
+        """
+        key = resolve_block_device(path) or os.stat(path).st_dev
+        with cls._registry_lock:
+            budget = cls._registry.get(key)
+            if budget is None:
+                budget = cls._registry[key] = cls(bytes_per_day, fsyncs_per_hour)
+            return budget
+
+    def _expire(self, now):
+        while self._writes and self._writes[0][0] <= now - _DAY:
+            self._written -= self._writes.popleft()[1]
+        while self._fsyncs and self._fsyncs[0] <= now - _HOUR:
+            self._fsyncs.popleft()
+
+    def try_write(self, size):
+        """预算允许时记下 size 字节的写入并返回 True"""
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            if self._written + size > self.bytes_per_day:
+                return False
+            self._writes.append((now, size))
+            self._written += size
+            return True
+
+    def try_fsync(self):
+        """预算允许时记下一次 fsync 并返回 True"""
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            if len(self._fsyncs) >= self.fsyncs_per_hour:
+                return False
+            self._fsyncs.append(now)
+            return True
+
+    def refund_write(self, size):
+        """撤销最近一次 try_write(size) 的记账（写入没有发生时调用）"""
+        with self._lock:
+            for i in range(len(self._writes) - 1, -1, -1):
+                if self._writes[i][1] == size:
+                    del self._writes[i]
+                    self._written -= size
+                    return
+
+    def refund_fsync(self):
+        """撤销最近一次 try_fsync 的记账"""
+        with self._lock:
+            if self._fsyncs:
+                self._fsyncs.pop()
+
+    @property
+    def written_today(self):
+        """最近 24 小时内已用的字节数"""
+        with self._lock:
+            self._expire(self.clock())
+            return self._written
+
+
+class WriteEngine(ReadEngine):
+    """
+    改写哨兵文件中的一个块
+
+    作为读取引擎的替代传给 KeepAliveTarget，调度器照常调用 read()；
+    预算不足时由 fallback 读取引擎（默认 auto）执行一次普通保活读取。
+    为避免误写用户数据，只接受哨兵文件。
+    """
+
+    name = "write"
+
+    def __init__(self, budget, fsync=True, block_size=BLOCK_SIZE, offset_mode="rotate",
+                 fallback="auto"):
+        super().__init__(block_size, offset_mode)
+        self.budget = budget
+        self.fsync = fsync
+        self.fallback = fallback if isinstance(fallback, ReadEngine) else create_read_engine(fallback)
+        self.writes = 0
+        self.bytes_written = 0
+        self.fsyncs = 0
+        self.budget_skips = 0
+        # 写放大只统计 fsync 过的写入：未落盘的写入何时到达设备不确定
+        self.measured_bytes = 0
+        self.device_bytes = 0
+        self._device = None
+        self._device_path = None
+
+    def read(self, path):
+        if os.path.basename(path) != SENTINEL_NAME:
+            raise ValueError(f"写入模式只能用于哨兵文件（{SENTINEL_NAME}）: {path}")
+        if not self.budget.try_write(self.block_size):
+            self.budget_skips += 1
+            return self.fallback.read(path)
+
+        # 预算先记账再写入，同一硬盘上的多个目标不会一起超支；写入没有发生时退还
+        fd = None
+        sync = False
+        written = None
+        try:
+            fd = self.open_fd(path, os.O_WRONLY | getattr(os, "O_BINARY", 0))
+            size = os.fstat(fd).st_size
+            if size < self.block_size:
+                raise ValueError(f"哨兵文件小于一个块（{self.block_size} 字节）: {path}")
+            offset = self.next_offset(size)
+            data = os.urandom(self.block_size)
+            sync = self.fsync and self.budget.try_fsync()
+            before = self._device_sectors(path) if sync else None
+            if hasattr(os, "pwrite"):
+                written = os.pwrite(fd, data, offset)
+            else:
+                os.lseek(fd, offset, os.SEEK_SET)
+                written = os.write(fd, data)
+            if sync:
+                # 只改写已分配的块、文件大小不变，fdatasync 不必写回时间戳
+                _fdatasync(fd)
+                self.fsyncs += 1
+                after = self._device_sectors(path) if before is not None else None
+                if after is not None:
+                    self.measured_bytes += written
+                    self.device_bytes += (after - before) * SECTOR_SIZE
+        except BaseException:
+            if written is None:
+                self.budget.refund_write(self.block_size)
+                if sync:
+                    self.budget.refund_fsync()
+            raise
+        finally:
+            if fd is not None:
+                os.close(fd)
+        self.writes += 1
+        self.bytes_written += written
+        return written
+
+    def _device_sectors(self, path):
+        if self._device_path != path:
+            self._device_path = path
+            self._device = resolve_block_device(path)
+        if self._device is None:
+            return None
+        return read_written_sectors(self._device)
+
+    @property
+    def amplification(self):
+        """设备实际写入 / 本工具写入，无法测量时为 None"""
+        if not self.measured_bytes:
+            return None
+        return self.device_bytes / self.measured_bytes
+
+    def close(self):
+        self.fallback.close()